@@ -1,9 +1,31 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 import os
+import argparse
+import bisect
+import csv
+import hashlib
+import heapq
+import hmac
+import html
+import json
 import logging
+import math
+import mmap
+import pickle
+import random
 import re
+import secrets
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
 
 # Configure logging
 logging.basicConfig(
@@ -12,6 +34,51 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Timing measurements go to the same log file, below the ERROR level used elsewhere
+timing_logger = logging.getLogger('student_system.timings')
+timing_logger.setLevel(logging.INFO)
+
+# Choices offered by the add student dialog
+CLASSIFICATIONS = ["Freshman", "Sophomore", "Junior", "Senior"]
+MAJORS = ["Computer Science", "Business", "Arts", "Engineering"]
+MIN_AGE = 5
+MAX_AGE = 100
+
+# Marks a removed student in the students file (out-of-core mode appends instead of rewriting)
+STUDENT_TOMBSTONE = '<removed>'
+
+# Out-of-core roster settings
+OUT_OF_CORE = os.environ.get('SIS_OUT_OF_CORE') == '1'  # Keep records on disk behind an ID index
+RECORD_CACHE_SIZE = 10000  # Records kept in memory in out-of-core mode
+INDEX_SORT_CHUNK_SIZE = 200000  # Index entries sorted in memory per run
+
+# Change feed settings
+CHANGE_LOG_SEGMENT_EVENTS = 100000  # Events in the active change log before it is rotated
+
+# Startup snapshot settings
+SNAPSHOT_MAGIC = b'SISSNAP\0'
+SNAPSHOT_VERSION = 7  # Bump whenever the snapshot contents change shape
+# Per-user secret the snapshot is signed with (SIS_SNAPSHOT_KEY overrides it)
+SNAPSHOT_KEY_FILE = os.path.join(os.path.expanduser('~'), '.student_system_snapshot_key')
+
+# Report export settings
+REPORTS_DIR = 'reports'
+REPORT_SORT_CHUNK_SIZE = 100000  # Records sorted in memory per run
+BACKGROUND_POLL_MS = 200  # How often the UI checks on a running export or duplicate check
+
+# Duplicate detection settings
+DUPLICATE_THRESHOLD = 0.85  # Minimum score for a candidate duplicate
+DUPLICATE_BLOCK_WINDOW = 20  # Neighbours compared per entry within a block
+DUPLICATE_PARTITIONS = 64  # Spool files block entries are partitioned into (one worker task each)
+WARN_ON_DUPLICATES = True  # Warn in the add student dialog about likely duplicates
+
+# Advanced search settings
+ADVANCED_SEARCH_LIMIT = 500  # Results listed in the advanced search dialog
+
+# Load test settings (relative operation weights per session)
+LOAD_TEST_MIX = {'login': 5, 'add': 20, 'search': 30, 'query': 10, 'remove': 15, 'count': 20}
+LOAD_TEST_PASSWORD = 'LoadTest#1'
+
 def log_error(error_message, exception=None):
     """
     Log errors with optional exception details
@@ -81,62 +148,1789 @@ def validate_password(password):
     
     return True, None
 
-class Student:
-    total_students = 0
+def parse_student_line(line):
+    """
+    Parse one line of the students file into a student dictionary
+    - Format: id|name|age|classification|major|grade
+    - Returns None for blank, malformed or removal (tombstone) lines
+    """
+    parts = line.strip().split('|')
+    if len(parts) < 6:
+        return None
+
+    student_id, name, age, classification, major, grade = parts[:6]
+
+    # Ages are stored as numbers; anything unparseable is kept as written
+    try:
+        age = int(age)
+    except ValueError:
+        pass
+    return {
+        'id': student_id,
+        'name': name,
+        'age': age,
+        'classification': classification,
+        'major': major,
+        'grade': grade
+    }
+
+def format_student_line(student_data):
+    """Format a student dictionary as one line of the students file"""
+    return f"{student_data['id']}|{student_data['name']}|{student_data['age']}|{student_data['classification']}|{student_data['major']}|{student_data.get('grade', 'N/A')}\n"
+
+def format_tombstone_line(student_id):
+    """Format the line appended to the students file when a student is removed"""
+    return f"{student_id}|{STUDENT_TOMBSTONE}\n"
+
+def is_tombstone_line(line):
+    """Check whether a students file line records a removal"""
+    parts = line.strip().split('|')
+    return len(parts) == 2 and parts[1] == STUDENT_TOMBSTONE
+
+def iter_student_records(students_file):
+    """Stream student dictionaries from the students file one line at a time"""
+    if not os.path.exists(students_file):
+        return
+
+    with open(students_file, 'r') as file:
+        for line in file:
+            student_data = parse_student_line(line)
+            if student_data is not None:
+                yield student_data
+
+def iter_student_changes(students_file):
+    """
+    Stream (student_id, student_data) pairs in file order
+    - student_data is None when the line removes the student
+    - Later lines for the same ID replace earlier ones
+    """
+    if not os.path.exists(students_file):
+        return
+
+    with open(students_file, 'r') as file:
+        for line in file:
+            if is_tombstone_line(line):
+                yield line.split('|', 1)[0], None
+                continue
+            student_data = parse_student_line(line)
+            if student_data is not None:
+                yield student_data['id'], student_data
+
+def _external_sort(items, key, work_dir, chunk_size, encode, decode):
+    """
+    Return an iterator over items sorted by key
+    - Sorts chunk_size items at a time into run files (encode/decode convert items to lines)
+    - The runs are merged lazily, so memory stays bounded by one chunk
+    """
+    run_files = []
+    chunk = []
+
+    def flush_chunk():
+        chunk.sort(key=key)
+        run_file = os.path.join(work_dir, f"run_{len(run_files)}.txt")
+        with open(run_file, 'w') as file:
+            for item in chunk:
+                file.write(encode(item))
+        run_files.append(run_file)
+        chunk.clear()
+
+    def read_run(run_file):
+        with open(run_file, 'r') as file:
+            for line in file:
+                yield decode(line)
+
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            flush_chunk()
+    if chunk:
+        flush_chunk()
+
+    return heapq.merge(*(read_run(run_file) for run_file in run_files), key=key)
+
+class Student:
+    total_students = 0
+
+    def __init__(self, student_id, name, age, grade):
+        self.student_id = student_id
+        self.name = name
+        self.age = age
+        self.grade = grade
+        Student.total_students += 1
+
+    def display_info(self):
+        return f"ID: {self.student_id}, Name: {self.name}, Age: {self.age}, Grade: {self.grade}"
+
+class ComputerScienceStudent(Student):
+    major = "Computer Science"
+    cs_students = 0
+
+    def __init__(self, student_id, name, age, grade):
+        super().__init__(student_id, name, age, grade)
+        ComputerScienceStudent.cs_students += 1
+
+    def coding_skill(self):
+        return f"{self.name} is skilled in Python programming."
+
+class BusinessStudent(Student):
+    major = "Business"
+    bus_students = 0
+
+    def __init__(self, student_id, name, age, grade):
+        super().__init__(student_id, name, age, grade)
+        BusinessStudent.bus_students += 1
+
+    def business_deals(self):
+        return f"{self.name} excels in negotiations."
+
+class ArtStudent(Student):
+    major = "Arts"
+    arts_students = 0
+
+    def __init__(self, student_id, name, age, grade):
+        super().__init__(student_id, name, age, grade)
+        ArtStudent.arts_students += 1
+
+    def creativity(self):
+        return f"{self.name} is great at creativity."
+
+class EngineeringStudent(Student):
+    major = "Engineering"
+    eng_students = 0
+
+    def __init__(self, student_id, name, age, grade):
+        super().__init__(student_id, name, age, grade)
+        EngineeringStudent.eng_students += 1
+
+    def specialization(self):
+        return f"{self.name} has excellent thinking ability."
+
+def _report_file_stem(major):
+    """Turn a major into a file name, e.g. 'Computer Science' -> 'computer_science'"""
+    return re.sub(r'[^a-z0-9]+', '_', major.lower()).strip('_') or 'unknown'
+
+def _name_sort_key(student_data):
+    """Sort roster rows by name, then ID for a stable order"""
+    return (student_data['name'].lower(), student_data['id'])
+
+def export_major_report(major, spool_file, output_dir, chunk_size=REPORT_SORT_CHUNK_SIZE):
+    """
+    Write the CSV and HTML roster for one major (runs in a worker process)
+    Returns (major, number of students, {stage: seconds})
+    """
+    timings = {}
+    stem = _report_file_stem(major)
+    csv_path = os.path.join(output_dir, f"{stem}.csv")
+    html_path = os.path.join(output_dir, f"{stem}.html")
+    work_dir = tempfile.mkdtemp(prefix=f"{stem}_", dir=os.path.dirname(spool_file))
+
+    try:
+        start = time.perf_counter()
+        rows = _external_sort(iter_student_records(spool_file), _name_sort_key, work_dir,
+                              chunk_size, format_student_line, parse_student_line)
+        timings['sort'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        count = 0
+        with open(csv_path, 'w', newline='') as csv_file, open(html_path, 'w') as html_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["Student ID", "Name", "Age", "Classification", "Grade"])
+
+            title = html.escape(f"{major} Roster")
+            html_file.write(f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n</head>\n<body>\n")
+            html_file.write(f"<h1>{title}</h1>\n<table border=\"1\">\n")
+            html_file.write("<tr><th>Student ID</th><th>Name</th><th>Age</th><th>Classification</th><th>Grade</th></tr>\n")
+
+            for student_data in rows:
+                row = [student_data['id'], student_data['name'], student_data['age'],
+                       student_data['classification'], student_data['grade']]
+                writer.writerow(row)
+                html_file.write("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>\n")
+                count += 1
+
+            html_file.write(f"</table>\n<p>Total Students: {count}</p>\n</body>\n</html>\n")
+        timings['write'] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return major, count, timings
+
+def export_reports(students_file, output_dir=REPORTS_DIR, max_workers=None,
+                   chunk_size=REPORT_SORT_CHUNK_SIZE):
+    """
+    Export a CSV and HTML roster per major, sorted by name
+    - Stage 1 streams the students file and partitions it into one spool file per major
+    - Stage 2 sorts and renders every major in its own worker process
+    Returns {'majors': {major: count}, 'timings': {stage: seconds}}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    spool_dir = tempfile.mkdtemp(prefix='export_', dir=output_dir)
+    timings = {}
+    total_start = time.perf_counter()
+
+    try:
+        # Stage 1: partition records by major without holding them in memory
+        start = time.perf_counter()
+        spool_files = {}
+        spools = {}
+        try:
+            for student_data in iter_student_records(students_file):
+                major = student_data['major']
+                if major not in spools:
+                    spool_files[major] = os.path.join(spool_dir, f"{_report_file_stem(major)}.txt")
+                    spools[major] = open(spool_files[major], 'w')
+                spools[major].write(format_student_line(student_data))
+        finally:
+            for spool in spools.values():
+                spool.close()
+        timings['partition'] = time.perf_counter() - start
+
+        # Majors without students still get an (empty) roster
+        for major in MAJORS:
+            if major not in spool_files:
+                spool_files[major] = os.path.join(spool_dir, f"{_report_file_stem(major)}.txt")
+                open(spool_files[major], 'w').close()
+
+        # Stage 2: sort and render each major in parallel
+        start = time.perf_counter()
+        counts = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(export_major_report, major, spool_file, output_dir, chunk_size)
+                       for major, spool_file in spool_files.items()]
+            for future in futures:
+                major, count, major_timings = future.result()
+                counts[major] = count
+                for stage, seconds in major_timings.items():
+                    timings[f"{major} {stage}"] = seconds
+        timings['render'] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    timings['total'] = time.perf_counter() - total_start
+    return {'majors': counts, 'timings': timings}
+
+def _normalize_name(name):
+    """Lowercase a name and keep only letters and single spaces"""
+    return ' '.join(re.sub(r'[^a-z ]+', '', name.lower()).split())
+
+def _normalize_age(age):
+    try:
+        return int(age)
+    except (TypeError, ValueError):
+        return None
+
+def soundex(word):
+    """American Soundex code of a word, e.g. 'Robert' -> 'R163'"""
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+
+    codes = {}
+    for letters, digit in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"),
+                           ("l", "4"), ("mn", "5"), ("r", "6")):
+        for letter in letters:
+            codes[letter] = digit
+
+    result = word[0].upper()
+    previous = codes.get(word[0], '')
+    for letter in word[1:]:
+        digit = codes.get(letter, '')
+        if digit and digit != previous:
+            result += digit
+        # 'h' and 'w' do not separate letters with the same code; vowels do
+        if letter not in "hw":
+            previous = digit
+    return (result + "000")[:4]
+
+def blocking_keys(student_data):
+    """
+    Keys that put likely duplicates of a student in the same block
+    - Normalized last name + age catches the same person under different IDs
+    - Phonetic codes of first and last name catch misspellings
+    - First initial + start of the last name + age catches typos late in the last name
+    """
+    name = _normalize_name(student_data.get('name', ''))
+    if not name:
+        return []
+
+    parts = name.split()
+    first, last = parts[0], parts[-1]
+    age = _normalize_age(student_data.get('age'))
+    return [
+        ('name-age', last, age),
+        ('phonetic', soundex(first), soundex(last)),
+        ('prefix-age', first[0], last[:3], age)
+    ]
+
+def _age_penalty(first_age, second_age):
+    """Score reduction for two students whose ages differ (an unknown age counts as a mismatch)"""
+    if first_age == second_age:
+        return 0.0
+    if first_age is not None and second_age is not None and abs(first_age - second_age) == 1:
+        return 0.05
+    return 0.2
+
+def duplicate_score(first, second):
+    """
+    Score how likely two (student_id, normalized name, age) entries are the same person
+    - Name similarity from 0 to 1, reduced when the ages differ
+    """
+    if first[1] == second[1]:
+        similarity = 1.0
+    else:
+        similarity = SequenceMatcher(None, first[1], second[1], autojunk=False).ratio()
+    return round(max(similarity - _age_penalty(first[2], second[2]), 0.0), 3)
+
+def duplicate_entry(student_data):
+    """Compact (student_id, normalized name, age) entry used for duplicate comparisons"""
+    return (student_data['id'], _normalize_name(student_data.get('name', '')),
+            _normalize_age(student_data.get('age')))
+
+def _compare_blocks(blocks, threshold, window):
+    """
+    Compare entries within each block and return (score, id_a, id_b) candidates (runs in a worker process)
+    - Blocks larger than window are sorted by name and each entry is only compared with
+      the next window entries (sorted neighbourhood)
+    """
+    candidates = []
+    matcher = SequenceMatcher(autojunk=False)
+    for entries in blocks:
+        entries = sorted(entries, key=lambda entry: entry[1])
+        for i, first in enumerate(entries):
+            # SequenceMatcher caches its analysis of the second sequence, so reuse it
+            matcher.set_seq2(first[1])
+            for second in entries[i + 1:i + 1 + window]:
+                penalty = _age_penalty(first[2], second[2])
+                if first[1] == second[1]:
+                    similarity = 1.0
+                else:
+                    matcher.set_seq1(second[1])
+                    # Cheap upper bounds rule out most pairs before the full ratio
+                    if (matcher.real_quick_ratio() - penalty < threshold
+                            or matcher.quick_ratio() - penalty < threshold):
+                        continue
+                    similarity = matcher.ratio()
+
+                score = round(max(similarity - penalty, 0.0), 3)
+                if score >= threshold:
+                    pair = sorted((first[0], second[0]))
+                    candidates.append((score, pair[0], pair[1]))
+    return candidates
+
+def _compare_partition(partition_file, threshold, window):
+    """Group one spooled partition into blocks and compare them (runs in a worker process)"""
+    blocks = {}
+    with open(partition_file, 'r') as file:
+        for line in file:
+            key, entry = json.loads(line)
+            blocks.setdefault(tuple(key), []).append(tuple(entry))
+    return _compare_blocks([entries for entries in blocks.values() if len(entries) > 1], threshold, window)
+
+def find_duplicates(students, threshold=DUPLICATE_THRESHOLD, window=DUPLICATE_BLOCK_WINDOW,
+                    max_workers=None, partitions=DUPLICATE_PARTITIONS, work_dir=None):
+    """
+    Find likely duplicate students without comparing every pair
+    - Groups students by blocking keys and compares only within each block
+    - Block entries are spooled to disk in partitions by key hash, so a block never spans
+      partitions and memory is bounded by one partition rather than the roster
+    - Partitions are compared in parallel worker processes
+    Returns {'candidates': [(score, id_a, id_b), ...] best first, 'timings': {stage: seconds}}
+    """
+    timings = {}
+    spool_dir = tempfile.mkdtemp(prefix='duplicates_', dir=work_dir)
+
+    try:
+        # Stage 1: spool compact (id, normalized name, age) entries, partitioned by blocking key
+        start = time.perf_counter()
+        partition_files = [os.path.join(spool_dir, f"partition_{number}.jsonl") for number in range(partitions)]
+        spools = [open(partition_file, 'w') for partition_file in partition_files]
+        try:
+            for student_data in students:
+                entry = duplicate_entry(student_data)
+                for key in blocking_keys(student_data):
+                    spools[hash(key) % partitions].write(json.dumps([key, entry]) + "\n")
+        finally:
+            for spool in spools:
+                spool.close()
+        timings['blocking'] = time.perf_counter() - start
+
+        # Stage 2: compare within blocks, one partition per task
+        start = time.perf_counter()
+        best = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_compare_partition, partition_file, threshold, window)
+                       for partition_file in partition_files if os.path.getsize(partition_file)]
+            for future in futures:
+                # A pair found in several blocks is only reported once
+                for score, id_a, id_b in future.result():
+                    if score > best.get((id_a, id_b), -1):
+                        best[(id_a, id_b)] = score
+        timings['compare'] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    candidates = sorted(((score, id_a, id_b) for (id_a, id_b), score in best.items()),
+                        key=lambda candidate: (-candidate[0], candidate[1], candidate[2]))
+    return {'candidates': candidates, 'timings': timings}
+
+def write_duplicates_report(candidates, students, output_dir=REPORTS_DIR):
+    """Write the ranked candidate duplicates as a CSV report and return its path"""
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, 'duplicate_candidates.csv')
+    with open(report_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Rank", "Score", "Student ID A", "Name A", "Age A",
+                         "Student ID B", "Name B", "Age B"])
+        for rank, (score, id_a, id_b) in enumerate(candidates, 1):
+            first = students.get(id_a) or {}
+            second = students.get(id_b) or {}
+            writer.writerow([rank, score, id_a, first.get('name', 'N/A'), first.get('age', 'N/A'),
+                             id_b, second.get('name', 'N/A'), second.get('age', 'N/A')])
+    return report_path
+
+class ChangeFeed:
+    """
+    In-process publish/subscribe feed of roster changes
+    - Every event gets the next sequence number
+    - Events are appended to a JSON lines log so consumers can resume from a sequence number
+    - Once the active log holds segment_events events it is moved to log_file + '.1',
+      replacing the previous segment; events older than that segment are dropped
+    - min_sequence is the oldest sequence number a consumer can still resume from
+    """
+
+    def __init__(self, log_file, segment_events=CHANGE_LOG_SEGMENT_EVENTS):
+        self.log_file = log_file
+        self.archive_file = log_file + '.1'
+        self.segment_events = segment_events
+        self.subscribers = []
+        self.lock = threading.RLock()
+
+        # Continue numbering after the last event, reading only the end of the logs
+        last_event = self._tail_event(self.log_file) or self._tail_event(self.archive_file)
+        self.last_sequence = last_event['seq'] if last_event else 0
+
+        first_event = self._head_event(self.log_file)
+        self.segment_start = first_event['seq'] if first_event else self.last_sequence + 1
+        oldest_event = self._head_event(self.archive_file) or first_event
+        self.min_sequence = oldest_event['seq'] - 1 if oldest_event else self.last_sequence
+
+    @staticmethod
+    def _head_event(path):
+        """Return the first complete event in a log file, or None"""
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'r') as file:
+            for line in file:
+                try:
+                    return json.loads(line)
+                except ValueError:
+                    continue
+        return None
+
+    @staticmethod
+    def _tail_event(path, block_size=4096):
+        """Return the last complete event in a log file by reading backwards from its end, or None"""
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as file:
+            position = file.seek(0, os.SEEK_END)
+            data = b''
+            while position > 0:
+                step = min(block_size, position)
+                position -= step
+                file.seek(position)
+                data = file.read(step) + data
+                lines = data.split(b'\n')
+                # The first piece may start mid-line until the start of the file is reached
+                for line in reversed(lines if position == 0 else lines[1:]):
+                    try:
+                        return json.loads(line)
+                    except ValueError:
+                        # A partially written last line (e.g. after a crash) is ignored
+                        continue
+        return None
+
+    def read_from(self, sequence):
+        """
+        Stream logged events with a sequence number greater than the given one
+        - Raises ValueError if events after the given sequence have been rotated out
+        """
+        if sequence < self.min_sequence:
+            raise ValueError(f"Change log only retains events after sequence {self.min_sequence}, "
+                             f"cannot resume from {sequence}")
+
+        paths = [self.log_file]
+        if sequence < self.segment_start - 1:
+            paths.insert(0, self.archive_file)
+        return self._read_events(paths, sequence)
+
+    def _read_events(self, paths, sequence):
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+
+            with open(path, 'r') as file:
+                for line in file:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # A partially written last line (e.g. after a crash) is ignored
+                        continue
+                    if event['seq'] > sequence:
+                        yield event
+
+    def _rotate(self):
+        """Move the full active log over the previous segment and start a new one"""
+        try:
+            os.replace(self.log_file, self.archive_file)
+        except OSError as e:
+            # Keep appending to the active log and try again on the next event
+            log_error("Failed to rotate change log", e)
+            return
+        self.min_sequence = self.segment_start - 1
+        self.segment_start = self.last_sequence + 1
+
+    def publish(self, op, student_id, data=None, previous=None):
+        """
+        Record a change and deliver it to every subscriber
+        - op is 'add', 'remove' or 'update'
+        - data is the record after the change, previous the record before it
+        """
+        with self.lock:
+            self.last_sequence += 1
+            event = {
+                'seq': self.last_sequence,
+                'op': op,
+                'id': student_id,
+                'data': data,
+                'previous': previous,
+                'time': time.time()
+            }
+
+            with open(self.log_file, 'a') as file:
+                file.write(json.dumps(event) + "\n")
+            if self.last_sequence - self.segment_start + 1 >= self.segment_events:
+                self._rotate()
+
+            for callback in list(self.subscribers):
+                try:
+                    callback(event)
+                except Exception as e:
+                    log_error(f"Change feed subscriber failed on event {event['seq']}", e)
+            return event
+
+    def subscribe(self, callback, from_sequence=None):
+        """
+        Register a callback for new events
+        - If from_sequence is given, logged events after it are replayed first
+        - Raises ValueError if from_sequence is older than min_sequence
+        """
+        with self.lock:
+            if from_sequence is not None:
+                for event in self.read_from(from_sequence):
+                    callback(event)
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop delivering events to a callback"""
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+class StudentCounts:
+    """Student counts by major and classification, kept up to date from the change feed"""
+
+    def __init__(self, students=()):
+        self.by_major = dict.fromkeys(MAJORS, 0)
+        self.by_classification = dict.fromkeys(CLASSIFICATIONS, 0)
+        for student_data in students:
+            self._apply(student_data, 1)
+
+    def _apply(self, student_data, delta):
+        major = student_data.get('major', 'Unknown')
+        if major in self.by_major:
+            self.by_major[major] += delta
+        classification = student_data.get('classification', 'Unknown')
+        if classification in self.by_classification:
+            self.by_classification[classification] += delta
+
+    def __call__(self, event):
+        if event['previous']:
+            self._apply(event['previous'], -1)
+        if event['data']:
+            self._apply(event['data'], 1)
+
+class DuplicateIndex:
+    """Student IDs by blocking key, kept up to date from the change feed to check new students"""
+
+    def __init__(self, students=()):
+        self.blocks = {}
+        for student_data in students:
+            self._add(student_data)
+
+    def _add(self, student_data):
+        for key in blocking_keys(student_data):
+            self.blocks.setdefault(key, set()).add(student_data['id'])
+
+    def _remove(self, student_data):
+        for key in blocking_keys(student_data):
+            block = self.blocks.get(key)
+            if block is not None:
+                block.discard(student_data['id'])
+                if not block:
+                    del self.blocks[key]
+
+    def __call__(self, event):
+        if event['previous']:
+            self._remove(event['previous'])
+        if event['data']:
+            self._add(event['data'])
+
+    def find_matches(self, student_data, students, threshold=DUPLICATE_THRESHOLD):
+        """Return [(score, other student), ...] likely duplicates of a student, best first"""
+        entry = duplicate_entry(student_data)
+        candidate_ids = set()
+        for key in blocking_keys(student_data):
+            candidate_ids |= self.blocks.get(key, set())
+        candidate_ids.discard(student_data['id'])
+
+        matches = []
+        for other_id in candidate_ids:
+            other = students.get(other_id)
+            if other is None:
+                continue
+            score = duplicate_score(entry, duplicate_entry(other))
+            if score >= threshold:
+                matches.append((score, other))
+        matches.sort(key=lambda match: -match[0])
+        return matches
+
+class StudentQuery:
+    """
+    Composable student filter; every method returns a new query, e.g.
+    StudentQuery().major("Engineering").classification("Junior").age_between(19, 21).name_contains("lee")
+    """
+
+    def __init__(self, filters=()):
+        self.filters = tuple(filters)
+
+    def _with(self, field, value):
+        return StudentQuery(self.filters + ((field, value),))
+
+    def major(self, major):
+        return self._with('major', major)
+
+    def classification(self, classification):
+        return self._with('classification', classification)
+
+    def age_between(self, low=None, high=None):
+        """Ages from low to high inclusive (either bound may be None)"""
+        return self._with('age', (low, high))
+
+    def id_prefix(self, prefix):
+        return self._with('id_prefix', prefix)
+
+    def name_contains(self, text):
+        return self._with('name', text.lower())
+
+    def matches(self, student_data):
+        """Check a student against every filter"""
+        return all(filter_matches(query_filter, student_data) for query_filter in self.filters)
+
+    def describe(self):
+        return " AND ".join(describe_filter(query_filter) for query_filter in self.filters) or "all students"
+
+def filter_matches(query_filter, student_data):
+    """Check one (field, value) query filter against a student"""
+    field, value = query_filter
+    if field == 'age':
+        age = _normalize_age(student_data.get('age'))
+        low, high = value
+        return age is not None and (low is None or age >= low) and (high is None or age <= high)
+    if field == 'id_prefix':
+        return student_data['id'].startswith(value)
+    if field == 'name':
+        return value in student_data.get('name', '').lower()
+    return student_data.get(field) == value
+
+def describe_filter(query_filter):
+    field, value = query_filter
+    if field == 'age':
+        low, high = value
+        return f"age between {low if low is not None else '-'} and {high if high is not None else '-'}"
+    if field == 'id_prefix':
+        return f"id starts with '{value}'"
+    if field == 'name':
+        return f"name contains '{value}'"
+    return f"{field} = '{value}'"
+
+class FieldIndex:
+    """Student IDs by the value of one field (e.g. major), kept up to date from the change feed"""
+
+    def __init__(self, field, students=()):
+        self.field = field
+        self.name = f"{field} index"
+        self.ids = {}
+        for student_data in students:
+            self._add(student_data)
+
+    def _add(self, student_data):
+        self.ids.setdefault(student_data.get(self.field), set()).add(student_data['id'])
+
+    def _remove(self, student_data):
+        ids = self.ids.get(student_data.get(self.field))
+        if ids is not None:
+            ids.discard(student_data['id'])
+
+    def __call__(self, event):
+        if event['previous']:
+            self._remove(event['previous'])
+        if event['data']:
+            self._add(event['data'])
+
+    def estimate(self, query_filter):
+        """Number of IDs lookup() would return, or None if this index cannot serve the filter"""
+        field, value = query_filter
+        if field != self.field:
+            return None
+        return len(self.ids.get(value, ()))
+
+    def lookup(self, query_filter):
+        return self.ids.get(query_filter[1], set())
+
+    def intersect(self, candidate_ids, query_filter):
+        return candidate_ids & self.lookup(query_filter)
+
+class IdPrefixIndex:
+    """Sorted student IDs, so an ID prefix is a binary-searched range"""
+
+    name = "id prefix index"
+
+    def __init__(self, students=()):
+        self.ids = sorted(student_data['id'] for student_data in students)
+
+    def __call__(self, event):
+        if event['op'] == 'add':
+            bisect.insort(self.ids, event['id'])
+        elif event['op'] == 'remove':
+            position = bisect.bisect_left(self.ids, event['id'])
+            if position < len(self.ids) and self.ids[position] == event['id']:
+                del self.ids[position]
+
+    def _range(self, prefix):
+        # Every ID starting with prefix sorts between prefix and prefix + U+10FFFF
+        return (bisect.bisect_left(self.ids, prefix),
+                bisect.bisect_left(self.ids, prefix + '\U0010ffff'))
+
+    def estimate(self, query_filter):
+        field, prefix = query_filter
+        if field != 'id_prefix':
+            return None
+        start, end = self._range(prefix)
+        return end - start
+
+    def lookup(self, query_filter):
+        start, end = self._range(query_filter[1])
+        return set(self.ids[start:end])
+
+    def intersect(self, candidate_ids, query_filter):
+        return {student_id for student_id in candidate_ids if student_id.startswith(query_filter[1])}
+
+class AgeIndex:
+    """
+    Student IDs bucketed by age, one bucket per year from MIN_AGE to MAX_AGE
+    - Also keeps per-classification age counts, so age/classification counts need no scan
+    - Students with a missing or out of range age are only tracked in 'other'; lookups include
+      them, so while there are any the planner re-checks the age filter on each candidate
+    - Those students are also counted per classification and age (None when missing or
+      non-numeric), so counts stay exact without checking any records
+    - Kept up to date from the change feed
+    """
+
+    name = "age index"
+
+    def __init__(self, students=()):
+        self.buckets = [set() for _ in range(MIN_AGE, MAX_AGE + 1)]
+        self.counts = {}  # classification -> students per age bucket
+        self.other = set()
+        self.outside_counts = {}  # classification -> {age outside the buckets or None: students}
+        for student_data in students:
+            self._add(student_data)
+
+    def _position(self, age):
+        age = _normalize_age(age)
+        if age is None or age < MIN_AGE or age > MAX_AGE:
+            return None
+        return age - MIN_AGE
+
+    def _add(self, student_data):
+        position = self._position(student_data.get('age'))
+        if position is None:
+            self.other.add(student_data['id'])
+            age = _normalize_age(student_data.get('age'))
+            outside = self.outside_counts.setdefault(student_data.get('classification'), {})
+            outside[age] = outside.get(age, 0) + 1
+            return
+        self.buckets[position].add(student_data['id'])
+        counts = self.counts.setdefault(student_data.get('classification'), [0] * len(self.buckets))
+        counts[position] += 1
+
+    def _remove(self, student_data):
+        position = self._position(student_data.get('age'))
+        if position is None:
+            if student_data['id'] not in self.other:
+                return
+            self.other.discard(student_data['id'])
+            age = _normalize_age(student_data.get('age'))
+            outside = self.outside_counts[student_data.get('classification')]
+            outside[age] -= 1
+            if not outside[age]:
+                del outside[age]
+            return
+        if student_data['id'] not in self.buckets[position]:
+            return
+        self.buckets[position].discard(student_data['id'])
+        self.counts[student_data.get('classification')][position] -= 1
+
+    def __call__(self, event):
+        if event['previous']:
+            self._remove(event['previous'])
+        if event['data']:
+            self._add(event['data'])
+
+    def _positions(self, age_range):
+        """Bucket positions covered by a (low, high) age range"""
+        low, high = age_range
+        low = MIN_AGE if low is None else max(low, MIN_AGE)
+        high = MAX_AGE if high is None else min(high, MAX_AGE)
+        if high < low:
+            # Also keeps the range usable as a slice (a negative stop would count from the end)
+            return range(0)
+        return range(low - MIN_AGE, high - MIN_AGE + 1)
+
+    def estimate(self, query_filter):
+        field, age_range = query_filter
+        if field != 'age':
+            return None
+        return sum(len(self.buckets[position]) for position in self._positions(age_range)) + len(self.other)
+
+    def is_exact(self, query_filter):
+        """True when every looked up student is known to match (no unbucketed students)"""
+        return not self.other
+
+    def lookup(self, query_filter):
+        return set(self.other).union(*(self.buckets[position] for position in self._positions(query_filter[1])))
+
+    def intersect(self, candidate_ids, query_filter):
+        # Each bucket & candidates iterates the smaller set, so small candidate sets stay cheap
+        result = self.other & candidate_ids
+        for position in self._positions(query_filter[1]):
+            result |= self.buckets[position] & candidate_ids
+        return result
+
+    def count(self, query):
+        """
+        Count students matching a query made only of an age range and/or a classification
+        Returns None when the query has any other filter
+        """
+        age_range = None
+        classification = None
+        for field, value in query.filters:
+            if field == 'age' and age_range is None:
+                age_range = value
+            elif field == 'classification' and classification is None:
+                classification = value
+            else:
+                return None
+
+        low, high = age_range or (None, None)
+        positions = self._positions((low, high))
+        if classification is None:
+            classifications = set(self.counts) | set(self.outside_counts)
+        else:
+            classifications = [classification]
+
+        total = 0
+        for classification in classifications:
+            total += sum(self.counts.get(classification, ())[positions.start:positions.stop])
+            # A missing or non-numeric age only counts when there is no age filter
+            total += sum(students for age, students in self.outside_counts.get(classification, {}).items()
+                         if (age is None and age_range is None)
+                         or (age is not None and (low is None or age >= low) and (high is None or age <= high)))
+        return total
+
+def build_query_indexes(students):
+    """Indexes available to the query planner (each is a change feed subscriber)"""
+    students = list(students)
+    return [FieldIndex('major', students), FieldIndex('classification', students),
+            AgeIndex(students), IdPrefixIndex(students)]
+
+class QueryPlanner:
+    """
+    Runs StudentQuery objects against a roster
+    - Uses the most selective index that can serve a filter, intersects any other
+      index-served filters, and checks the remaining filters on each candidate
+    - Filters served by an index that can return non-matching students (is_exact() is
+      False) are checked on each candidate as well
+    - Falls back to a full scan when no index applies
+    """
+
+    def __init__(self, students, indexes=()):
+        self.students = students
+        self.indexes = list(indexes)
+
+    def plan(self, query):
+        """Return (index steps, residual filters); index steps are (estimate, index, filter), most selective first"""
+        index_steps = []
+        residual = []
+        for query_filter in query.filters:
+            best = None
+            for index in self.indexes:
+                estimate = index.estimate(query_filter)
+                if estimate is not None and (best is None or estimate < best[0]):
+                    best = (estimate, index, query_filter)
+            if best is None:
+                residual.append(query_filter)
+            else:
+                index_steps.append(best)
+                if hasattr(best[1], 'is_exact') and not best[1].is_exact(query_filter):
+                    residual.append(query_filter)
+        index_steps.sort(key=lambda step: step[0])
+        return index_steps, residual
+
+    def explain(self, query):
+        """Describe how a query would be run"""
+        index_steps, residual = self.plan(query)
+        lines = [f"Query: {query.describe()}"]
+        step = 1
+        if index_steps:
+            estimate, index, query_filter = index_steps[0]
+            lines.append(f"{step}. Look up {describe_filter(query_filter)} in {index.name} (~{estimate} students)")
+            for estimate, index, query_filter in index_steps[1:]:
+                step += 1
+                lines.append(f"{step}. Intersect with {describe_filter(query_filter)} from {index.name} (~{estimate} students)")
+        else:
+            lines.append(f"{step}. Scan all {len(self.students)} students")
+        for query_filter in residual:
+            step += 1
+            lines.append(f"{step}. Check {describe_filter(query_filter)} on each candidate")
+        return "\n".join(lines)
+
+    def run(self, query, limit=None):
+        """
+        Run a query and return {'students': [...] sorted by name, 'total': int, 'explain': str,
+        'timings': {stage: ms}}
+        - With a limit only the first students by name are kept, so memory stays bounded by the
+          limit rather than the number of matches; 'total' still counts every match
+        """
+        timings = {}
+        # Indexes change together with the roster, so hold its lock for a consistent answer
+        with self.students.lock:
+            start = time.perf_counter()
+            index_steps, residual = self.plan(query)
+            timings['plan'] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            if index_steps:
+                candidate_ids = set(index_steps[0][1].lookup(index_steps[0][2]))
+                for _, index, query_filter in index_steps[1:]:
+                    if not candidate_ids:
+                        break
+                    candidate_ids = index.intersect(candidate_ids, query_filter)
+                candidates = (self.students.get(student_id) for student_id in candidate_ids)
+            else:
+                candidates = self.students.values()
+
+            total = 0
+
+            def matches():
+                nonlocal total
+                for student_data in candidates:
+                    if (student_data is not None
+                            and all(filter_matches(query_filter, student_data) for query_filter in residual)):
+                        total += 1
+                        yield student_data
+
+            matching = matches()
+            if limit is None:
+                results = sorted(matching, key=_name_sort_key)
+            else:
+                results = heapq.nsmallest(limit, matching, key=_name_sort_key)
+                # nsmallest does not read anything for a limit of 0, so finish counting
+                for _ in matching:
+                    pass
+        timings['execute'] = (time.perf_counter() - start) * 1000
+
+        return {'students': results, 'total': total, 'explain': self.explain(query), 'timings': timings}
+
+    def count(self, query):
+        """
+        Count matching students and return {'count': int, 'explain': str, 'timings': {stage: ms}}
+        - Answered from an index's aggregate counts when one covers the query, otherwise by running it
+        """
+        with self.students.lock:
+            start = time.perf_counter()
+            for index in self.indexes:
+                count = index.count(query) if hasattr(index, 'count') else None
+                if count is not None:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    return {'count': count,
+                            'explain': f"Query: {query.describe()}\n1. Sum counts in {index.name}",
+                            'timings': {'plan': 0.0, 'execute': elapsed}}
+
+            result = self.run(query, limit=0)
+        return {'count': result['total'], 'explain': result['explain'], 'timings': result['timings']}
+
+class StudentRoster:
+    """
+    Student records keyed by student ID, saved to the students file
+    - Every add, remove and update is published on the change feed
+    """
+
+    def __init__(self, students_file, change_feed=None):
+        self.students_file = students_file
+        self.change_feed = change_feed
+        self.students = {}
+        # Held while changing the roster (and notifying subscribers) or scanning it
+        self.lock = threading.RLock()
+
+    def load(self):
+        """Load existing student data from text file"""
+        self.students = {}
+        for student_id, student_data in iter_student_changes(self.students_file):
+            if student_data is None:
+                self.students.pop(student_id, None)
+            else:
+                self.students[student_id] = student_data
+
+    def save(self):
+        """Save student data to text file"""
+        with open(self.students_file, 'w') as file:
+            for student_data in self.students.values():
+                # Create a text line with all student details
+                file.write(format_student_line(student_data))
+
+    def compact(self):
+        """Rewrite the students file with one line per current student"""
+        self.save()
+
+    def close(self):
+        """Release resources held by the roster (nothing to do in memory mode)"""
+
+    def _publish(self, op, student_id, data=None, previous=None):
+        if self.change_feed is not None:
+            self.change_feed.publish(op, student_id, data, previous)
+
+    def add(self, student_data):
+        """Add a new student and save the roster"""
+        with self.lock:
+            student_id = student_data['id']
+            valid, message = validate_student_id(student_id)
+            if not valid:
+                raise ValueError(message)
+            if student_id in self.students:
+                raise ValueError(f"Student ID {student_id} already exists")
+
+            self.students[student_id] = student_data
+            self.save()
+            self._publish('add', student_id, data=student_data)
+
+    def remove(self, student_id):
+        """Remove a student and save the roster"""
+        with self.lock:
+            previous = self.students.pop(student_id)
+            self.save()
+            self._publish('remove', student_id, previous=previous)
+            return previous
+
+    def update(self, student_id, **changes):
+        """Change fields of an existing student and save the roster"""
+        with self.lock:
+            previous = self.students[student_id]
+            student_data = {**previous, **changes, 'id': student_id}
+            self.students[student_id] = student_data
+            self.save()
+            self._publish('update', student_id, data=student_data, previous=previous)
+            return student_data
+
+    # Read access works like the dictionary the roster used to be
+    def __contains__(self, student_id):
+        return student_id in self.students
+
+    def __getitem__(self, student_id):
+        return self.students[student_id]
+
+    def __len__(self):
+        return len(self.students)
+
+    def __iter__(self):
+        return iter(self.students)
+
+    def get(self, student_id, default=None):
+        return self.students.get(student_id, default)
+
+    def items(self):
+        return self.students.items()
+
+    def values(self):
+        return self.students.values()
+
+class LRUCache:
+    """Fixed-size least recently used cache with hit/miss/eviction counters"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Cache a value, evicting the least recently used entry when full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+class DiskStudentRoster:
+    """
+    Out-of-core student roster
+    - Records stay in the students file; a sorted ID index (students.idx) maps IDs to file offsets
+    - The index is memory-mapped and binary searched, and hot records are kept in an LRU cache
+    - Changes are appended to the students file (removals as tombstone lines) and the file is
+      compacted on close, so memory stays bounded by the cache size
+    - Every add, remove and update is published on the change feed
+    - Lines whose ID is too long for the index are not loaded, but are kept as written
+    """
+
+    INDEX_MAGIC = b'SISIDX3\0'
+    # magic, source size, source mtime_ns, entry count, line count, unindexed line count
+    INDEX_HEADER = struct.Struct('<8sQqQQQ')
+    INDEX_ENTRY = struct.Struct('<40sQ')  # student ID (NUL padded), line offset
+    ID_WIDTH = 40  # Fits any ID validate_student_id accepts (10 characters of up to 4 UTF-8 bytes)
+
+    def __init__(self, students_file, change_feed=None, cache_size=RECORD_CACHE_SIZE,
+                 sort_chunk_size=INDEX_SORT_CHUNK_SIZE):
+        self.students_file = students_file
+        self.index_file = os.path.splitext(students_file)[0] + '.idx'
+        self.change_feed = change_feed
+        self.cache = LRUCache(cache_size)
+        self.sort_chunk_size = sort_chunk_size
+        self.lock = threading.RLock()
+
+        self.index = None
+        self.index_count = 0
+        self.reader = None
+
+        # Changes since the index was built
+        self.overlay = {}  # student ID -> offset of its latest line
+        self.removed = set()  # IDs in the index that have been removed
+        self.count = 0
+        self.dirty = False  # True when the file holds superseded or tombstone lines
+        self.unindexed = 0  # Lines kept in the file whose ID does not fit the index
+
+    # Index file
+
+    def load(self):
+        """Open the ID index, rebuilding it if it is missing or out of date"""
+        with self.lock:
+            if not os.path.exists(self.students_file):
+                open(self.students_file, 'w').close()
+
+            if not self._index_is_current():
+                self._build_index()
+            self._open_index()
+
+    def _index_is_current(self):
+        if not os.path.exists(self.index_file):
+            return False
+
+        stat = os.stat(self.students_file)
+        with open(self.index_file, 'rb') as file:
+            header = file.read(self.INDEX_HEADER.size)
+        if len(header) < self.INDEX_HEADER.size:
+            return False
+
+        magic, size, mtime_ns = self.INDEX_HEADER.unpack(header)[:3]
+        return magic == self.INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+    def _fits_index(self, student_id):
+        return len(student_id.encode('utf-8')) <= self.ID_WIDTH
+
+    def _encode_id(self, student_id):
+        key = student_id.encode('utf-8')
+        if len(key) > self.ID_WIDTH:
+            raise ValueError(f"Student ID {student_id} is longer than {self.ID_WIDTH} bytes")
+        return key.ljust(self.ID_WIDTH, b'\0')
+
+    def _write_index(self, entries, line_count=None):
+        """
+        Write (student_id, offset) pairs, already sorted by ID, as the index file
+        - line_count is called once the entries are written and returns the number of record
+          lines in the students file; by default every line is assumed to be indexed
+        """
+        temp_file = self.index_file + '.tmp'
+        count = 0
+        with open(temp_file, 'wb') as file:
+            file.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, 0, 0, 0, 0, 0))
+            for student_id, offset in entries:
+                file.write(self.INDEX_ENTRY.pack(self._encode_id(student_id), offset))
+                count += 1
+
+            # The header is written last so an interrupted build is never trusted
+            lines = line_count() if line_count is not None else count
+            stat = os.stat(self.students_file)
+            file.seek(0)
+            file.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, count, lines,
+                                              self.unindexed))
+        os.replace(temp_file, self.index_file)
+
+    def _scan_lines(self):
+        """Yield (student_id, offset, removed) for every line of the students file"""
+        offset = 0
+        with open(self.students_file, 'rb') as file:
+            for line in file:
+                text = line.decode('utf-8')
+                if is_tombstone_line(text):
+                    yield text.split('|', 1)[0], offset, True
+                elif parse_student_line(text) is not None:
+                    yield text.split('|', 1)[0], offset, False
+                offset += len(line)
+
+    def _build_index(self):
+        """Build the ID index from the students file with a bounded-memory external sort"""
+        work_dir = tempfile.mkdtemp(prefix='index_', dir=os.path.dirname(self.students_file) or '.')
+        lines = 0
+        self.unindexed = 0
+
+        def encode(entry):
+            return f"{entry[0]}|{entry[1]}|{int(entry[2])}\n"
+
+        def decode(line):
+            student_id, offset, removed = line.rstrip('\n').split('|')
+            return student_id, int(offset), removed == '1'
+
+        def indexable(entries):
+            # Lines whose ID cannot be indexed are left out of the index but kept in the file
+            for entry in entries:
+                if not self._fits_index(entry[0]):
+                    log_error(f"Student line at offset {entry[1]} is not loaded: "
+                              f"ID {entry[0]!r} is longer than {self.ID_WIDTH} bytes")
+                    self.unindexed += 1
+                    continue
+                yield entry
+
+        def latest_entries(sorted_entries):
+            # Entries are sorted by (ID, offset); the last line for an ID wins
+            nonlocal lines
+            current = None
+            for entry in sorted_entries:
+                lines += 1
+                if current is not None and current[0] != entry[0] and not current[2]:
+                    yield current[0], current[1]
+                current = entry
+            if current is not None and not current[2]:
+                yield current[0], current[1]
+
+        try:
+            sorted_entries = _external_sort(indexable(self._scan_lines()), lambda entry: (entry[0], entry[1]),
+                                            work_dir, self.sort_chunk_size, encode, decode)
+            self._write_index(latest_entries(sorted_entries), lambda: lines)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _open_index(self):
+        self.close()
+        with open(self.index_file, 'rb') as file:
+            header = self.INDEX_HEADER.unpack(file.read(self.INDEX_HEADER.size))
+            self.index_count, lines, self.unindexed = header[3:]
+            # mmap cannot map an empty range, so an empty index is never mapped
+            if self.index_count:
+                self.index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.reader = open(self.students_file, 'rb')
+        self.overlay = {}
+        self.removed = set()
+        self.count = self.index_count
+        # The line count is stored in the header, so a reopened index still knows the file needs compacting
+        self.dirty = lines != self.index_count
+
+    def close(self):
+        """Close the index and students file (compacting the file if it has changed)"""
+        with self.lock:
+            if self.dirty and self.reader is not None:
+                self.dirty = False
+                self.compact()
+            if self.index is not None:
+                self.index.close()
+                self.index = None
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+    def _index_entry(self, position):
+        start = self.INDEX_HEADER.size + position * self.INDEX_ENTRY.size
+        key, offset = self.INDEX_ENTRY.unpack_from(self.index, start)
+        return key, offset
+
+    def _index_lookup(self, student_id):
+        """Binary search the index for a student ID and return its line offset"""
+        try:
+            key = self._encode_id(student_id)
+        except ValueError:
+            return None
+
+        low, high = 0, self.index_count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, offset = self._index_entry(middle)
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return offset
+        return None
+
+    def _iter_index(self):
+        """Yield (student_id, offset) for every index entry in ID order"""
+        for position in range(self.index_count):
+            key, offset = self._index_entry(position)
+            yield key.rstrip(b'\0').decode('utf-8'), offset
+
+    def _offset_of(self, student_id):
+        if student_id in self.overlay:
+            return self.overlay[student_id]
+        if student_id in self.removed:
+            return None
+        return self._index_lookup(student_id)
+
+    def _read_record(self, offset):
+        self.reader.seek(offset)
+        return parse_student_line(self.reader.readline().decode('utf-8'))
+
+    def _live_offsets(self):
+        """Yield (student_id, offset) for every current student in ID order"""
+        index_entries = ((student_id, offset) for student_id, offset in self._iter_index()
+                         if student_id not in self.overlay and student_id not in self.removed)
+        return heapq.merge(index_entries, sorted(self.overlay.items()))
+
+    def compact(self):
+        """Rewrite the students file with one line per current student and rebuild the index"""
+        with self.lock:
+            temp_file = self.students_file + '.tmp'
+            offset = 0
+
+            # Records are written in ID order, so the new index needs no sorting
+            index_temp = self.index_file + '.entries'
+            with open(temp_file, 'wb') as file, open(index_temp, 'wb') as index_entries:
+                for student_id, old_offset in self._live_offsets():
+                    line = format_student_line(self._read_record(old_offset)).encode('utf-8')
+                    file.write(line)
+                    index_entries.write(self.INDEX_ENTRY.pack(self._encode_id(student_id), offset))
+                    offset += len(line)
+
+                # Lines the index cannot hold are copied through unchanged, never dropped
+                if self.unindexed:
+                    self.unindexed = 0
+                    self.reader.seek(0)
+                    for line in self.reader:
+                        if not self._fits_index(line.decode('utf-8').split('|', 1)[0]):
+                            file.write(line)
+                            self.unindexed += 1
+
+            def read_entries():
+                with open(index_temp, 'rb') as file:
+                    while True:
+                        block = file.read(self.INDEX_ENTRY.size * 4096)
+                        if not block:
+                            break
+                        for key, entry_offset in self.INDEX_ENTRY.iter_unpack(block):
+                            yield key.rstrip(b'\0').decode('utf-8'), entry_offset
+
+            if self.index is not None:
+                self.index.close()
+                self.index = None
+            self.reader.close()
+            self.reader = None
+
+            os.replace(temp_file, self.students_file)
+            self._write_index(read_entries())
+            os.remove(index_temp)
+            self.dirty = False
+            self._open_index()
+
+    # Changes
+
+    def _append(self, line):
+        with open(self.students_file, 'ab') as file:
+            offset = file.tell()
+            file.write(line.encode('utf-8'))
+        self.dirty = True
+        return offset
+
+    def _publish(self, op, student_id, data=None, previous=None):
+        if self.change_feed is not None:
+            self.change_feed.publish(op, student_id, data, previous)
+
+    def add(self, student_data):
+        """Add a new student by appending it to the students file"""
+        with self.lock:
+            student_id = student_data['id']
+            valid, message = validate_student_id(student_id)
+            if not valid:
+                raise ValueError(message)
+            if student_id in self:
+                raise ValueError(f"Student ID {student_id} already exists")
+
+            self.overlay[student_id] = self._append(format_student_line(student_data))
+            self.removed.discard(student_id)
+            self.count += 1
+            self.cache.put(student_id, student_data)
+            self._publish('add', student_id, data=student_data)
+
+    def remove(self, student_id):
+        """Remove a student by appending a tombstone line"""
+        with self.lock:
+            previous = self[student_id]
+            self._append(format_tombstone_line(student_id))
+            self.overlay.pop(student_id, None)
+            self.removed.add(student_id)
+            self.count -= 1
+            self.cache.discard(student_id)
+            self._publish('remove', student_id, previous=previous)
+            return previous
+
+    def update(self, student_id, **changes):
+        """Change fields of an existing student by appending its new line"""
+        with self.lock:
+            previous = self[student_id]
+            student_data = {**previous, **changes, 'id': student_id}
+            self.overlay[student_id] = self._append(format_student_line(student_data))
+            self.cache.put(student_id, student_data)
+            self._publish('update', student_id, data=student_data, previous=previous)
+            return student_data
+
+    def save(self):
+        """Changes are written as they happen; saving compacts the file"""
+        self.compact()
+
+    # Read access works like the in-memory roster, paging records in on demand
+    def __contains__(self, student_id):
+        with self.lock:
+            return self._offset_of(student_id) is not None
+
+    def __getitem__(self, student_id):
+        student_data = self.get(student_id)
+        if student_data is None:
+            raise KeyError(student_id)
+        return student_data
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for student_id, _ in self.items():
+            yield student_id
+
+    def get(self, student_id, default=None):
+        with self.lock:
+            student_data = self.cache.get(student_id)
+            if student_data is not None:
+                return student_data
+
+            offset = self._offset_of(student_id)
+            if offset is None:
+                return default
+
+            student_data = self._read_record(offset)
+            self.cache.put(student_id, student_data)
+            return student_data
+
+    def items(self):
+        """Stream (student_id, student_data) pairs by reading the students file sequentially"""
+        offset = 0
+        with open(self.students_file, 'rb') as file:
+            for line in file:
+                line_offset = offset
+                offset += len(line)
+                student_data = parse_student_line(line.decode('utf-8'))
+                if student_data is None:
+                    continue
+                # Skip lines that a later change superseded, and lines left out of the index
+                if (self.dirty or self.unindexed) and self._offset_of(student_data['id']) != line_offset:
+                    continue
+                yield student_data['id'], student_data
+
+    def values(self):
+        for _, student_data in self.items():
+            yield student_data
+
+def file_signature(path):
+    """Return (size, mtime_ns, sha256) identifying a file's contents, or None if it is missing"""
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+def snapshot_settings():
+    """Return the settings that change what the loaded state contains"""
+    return {
+        'out_of_core': OUT_OF_CORE,
+        'warn_on_duplicates': WARN_ON_DUPLICATES
+    }
+
+def snapshot_key():
+    """
+    Return the secret key snapshots are signed with
+    - Taken from SIS_SNAPSHOT_KEY if set, otherwise from SNAPSHOT_KEY_FILE, which is created
+      (readable by the current user only) on first use
+    """
+    key = os.environ.get('SIS_SNAPSHOT_KEY')
+    if key:
+        return key.encode('utf-8')
+
+    try:
+        descriptor = os.open(SNAPSHOT_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(SNAPSHOT_KEY_FILE, 'rb') as file:
+            return file.read()
+
+    key = secrets.token_bytes(32)
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(key)
+    return key
+
+class _SigningWriter:
+    """File wrapper that feeds everything written through it to an HMAC"""
+
+    def __init__(self, file, mac):
+        self.file = file
+        self.mac = mac
+
+    def write(self, data):
+        self.mac.update(data)
+        return self.file.write(data)
+
+def save_snapshot(snapshot_file, source_files, state, settings=None):
+    """
+    Save loaded state (records, indexes, aggregates) as a versioned binary snapshot
+    - Layout: magic, version, HMAC-SHA256 of the rest, pickled source file signatures,
+      pickled settings, pickled state
+    - The HMAC (keyed with snapshot_key()) keeps a tampered snapshot from ever being unpickled
+    - The signatures tie the snapshot to the exact source files it was built from
+    - The settings tie it to the mode it was built in (e.g. out-of-core state has no records)
+    """
+    signatures = {path: file_signature(path) for path in source_files}
+    mac = hmac.new(snapshot_key(), digestmod=hashlib.sha256)
+    temp_file = snapshot_file + '.tmp'
+    with open(temp_file, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(struct.pack('<I', SNAPSHOT_VERSION))
+        mac_offset = file.tell()
+        file.write(bytes(mac.digest_size))
 
-    def __init__(self, student_id, name, age, grade):
-        self.student_id = student_id
-        self.name = name
-        self.age = age
-        self.grade = grade
-        Student.total_students += 1
+        writer = _SigningWriter(file, mac)
+        pickle.dump(signatures, writer, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(settings, writer, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(state, writer, protocol=pickle.HIGHEST_PROTOCOL)
 
-    def display_info(self):
-        return f"ID: {self.student_id}, Name: {self.name}, Age: {self.age}, Grade: {self.grade}"
+        file.seek(mac_offset)
+        file.write(mac.digest())
+    os.replace(temp_file, snapshot_file)
 
-class ComputerScienceStudent(Student):
-    major = "Computer Science"
-    cs_students = 0
+def load_snapshot(snapshot_file, source_files, settings=None):
+    """
+    Load a snapshot saved by save_snapshot
+    - Returns None if it is missing, from another version, not signed with this user's key,
+      saved with different settings, or any source file's size, mtime or checksum no longer matches
+    - The signature is checked before anything is unpickled
+    """
+    if not os.path.exists(snapshot_file):
+        return None
 
-    def __init__(self, student_id, name, age, grade):
-        super().__init__(student_id, name, age, grade)
-        ComputerScienceStudent.cs_students += 1
+    try:
+        with open(snapshot_file, 'rb') as file:
+            if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            if struct.unpack('<I', file.read(4))[0] != SNAPSHOT_VERSION:
+                return None
 
-    def coding_skill(self):
-        return f"{self.name} is skilled in Python programming."
+            mac = hmac.new(snapshot_key(), digestmod=hashlib.sha256)
+            expected_mac = file.read(mac.digest_size)
+            payload_offset = file.tell()
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                mac.update(block)
+            if not hmac.compare_digest(mac.digest(), expected_mac):
+                log_error(f"Snapshot {snapshot_file} is not signed with this user's key; ignoring it")
+                return None
+            file.seek(payload_offset)
 
-class BusinessStudent(Student):
-    major = "Business"
-    bus_students = 0
+            signatures = pickle.load(file)
+            if set(signatures) != set(source_files):
+                return None
+            if pickle.load(file) != settings:
+                return None
 
-    def __init__(self, student_id, name, age, grade):
-        super().__init__(student_id, name, age, grade)
-        BusinessStudent.bus_students += 1
+            # Cheap size/mtime checks first, then the checksum
+            for path in source_files:
+                expected = signatures[path]
+                if expected is None:
+                    # The file did not exist when the snapshot was saved
+                    if os.path.exists(path):
+                        return None
+                    continue
+                if not os.path.exists(path):
+                    return None
+                stat = os.stat(path)
+                if (stat.st_size, stat.st_mtime_ns) != expected[:2]:
+                    return None
+                if file_signature(path) != expected:
+                    return None
 
-    def business_deals(self):
-        return f"{self.name} excels in negotiations."
+            return pickle.load(file)
+    except Exception as e:
+        log_error(f"Could not read snapshot {snapshot_file}", e)
+        return None
 
-class ArtStudent(Student):
-    major = "Arts"
-    arts_students = 0
+def authenticate(users, username, password):
+    """Check a username and password against the loaded user credentials"""
+    return username in users and users[username] == password
 
-    def __init__(self, student_id, name, age, grade):
-        super().__init__(student_id, name, age, grade)
-        ArtStudent.arts_students += 1
+def search_students_by_name(students, first_name, last_name):
+    """
+    Find students whose name contains the given (lowercase) first and/or last name
+    Returns a list of (student_id, student_data) pairs
+    """
+    matches = []
+    with students.lock:
+        for student_id, student_data in students.items():
+            full_name = student_data.get('name', '').lower()
 
-    def creativity(self):
-        return f"{self.name} is great at creativity."
+            # Check if both first and last names match
+            if first_name and last_name:
+                if first_name in full_name and last_name in full_name:
+                    matches.append((student_id, student_data))
+            # Check if either first or last name matches
+            elif first_name:
+                if first_name in full_name:
+                    matches.append((student_id, student_data))
+            elif last_name:
+                if last_name in full_name:
+                    matches.append((student_id, student_data))
+    return matches
 
-class EngineeringStudent(Student):
-    major = "Engineering"
-    eng_students = 0
+def load_users(users_file):
+    """Load existing user credentials from text file"""
+    users = {}
+    try:
+        if os.path.exists(users_file):
+            with open(users_file, 'r') as file:
+                for line in file:
+                    username, password = line.strip().split(':', 1)
+                    users[username] = password
+    except Exception as e:
+        print(f"Error loading users: {e}")
+    return users
 
-    def __init__(self, student_id, name, age, grade):
-        super().__init__(student_id, name, age, grade)
-        EngineeringStudent.eng_students += 1
+def load_students(students_file, change_feed=None, records=None):
+    """Load existing student data from text file (or from already loaded records)"""
+    if OUT_OF_CORE:
+        # Records stay on disk and are paged in through the record cache
+        students = DiskStudentRoster(students_file, change_feed)
+    else:
+        students = StudentRoster(students_file, change_feed)
+    try:
+        if records is not None and not OUT_OF_CORE:
+            students.students = records
+        else:
+            students.load()
+    except Exception as e:
+        print(f"Error loading students: {e}")
+    return students
 
-    def specialization(self):
-        return f"{self.name} has excellent thinking ability."
+def load_roster_state(users_file, students_file, change_feed, snapshot_file=None):
+    """
+    Load users and students and wire up everything kept current from the change feed
+    - Reuses the startup snapshot when one is given and it matches the data files
+    - Otherwise rebuilds everything from the text files (and saves a fresh snapshot)
+    - Returns (state, from_snapshot); state holds users, students, student_counts,
+      duplicate_index, query_indexes and query_planner
+    """
+    state = None
+    if snapshot_file is not None:
+        state = load_snapshot(snapshot_file, [users_file, students_file], snapshot_settings())
+    from_snapshot = state is not None
+
+    if from_snapshot:
+        state['students'] = load_students(students_file, change_feed, state['students'])
+    else:
+        # Load users and students from text files
+        students = load_students(students_file, change_feed)
+        state = {
+            'users': load_users(users_file),
+            'students': students,
+            # Counts are built once and then updated from the change feed
+            'student_counts': StudentCounts(students.values()),
+            # The inline duplicate check keeps blocking keys in memory, so it is off out-of-core
+            'duplicate_index': (DuplicateIndex(students.values())
+                                if WARN_ON_DUPLICATES and not OUT_OF_CORE else None),
+            # Query indexes are kept in memory, so out-of-core queries always scan
+            'query_indexes': [] if OUT_OF_CORE else build_query_indexes(students.values())
+        }
+        if snapshot_file is not None:
+            save_roster_snapshot(snapshot_file, users_file, students_file, state)
+
+    change_feed.subscribe(state['student_counts'])
+    if state['duplicate_index'] is not None:
+        change_feed.subscribe(state['duplicate_index'])
+    for index in state['query_indexes']:
+        change_feed.subscribe(index)
+    state['query_planner'] = QueryPlanner(state['students'], state['query_indexes'])
+    return state, from_snapshot
+
+def save_roster_snapshot(snapshot_file, users_file, students_file, state):
+    """Save loaded roster state as the startup snapshot (errors are logged, not raised)"""
+    # Out-of-core records are already indexed on disk, so only aggregates are kept
+    records = None if OUT_OF_CORE else state['students'].students
+    try:
+        save_snapshot(snapshot_file, [users_file, students_file], {
+            'users': state['users'],
+            'students': records,
+            'student_counts': state['student_counts'],
+            'duplicate_index': state['duplicate_index'],
+            'query_indexes': state['query_indexes']
+        }, snapshot_settings())
+    except Exception as e:
+        log_error("Could not save the startup snapshot", e)
 
 class LoginSystem:
     def __init__(self, master):
@@ -152,10 +1946,14 @@ class LoginSystem:
         
         self.users_file = 'data/users.txt'
         self.students_file = 'data/students.txt'
+        self.changes_file = 'data/changes.log'
+        self.snapshot_file = 'data/snapshot.bin'
+
+        # Every roster change is published here for incremental consumers
+        self.change_feed = ChangeFeed(self.changes_file)
         
-        # Load users and students from text files
-        self.users = self.load_users()
-        self.students = self.load_students()
+        # Load users and students (from the snapshot when it is still valid)
+        self.load_state()
         
         # Login attempt tracking
         self.login_attempts = 0
@@ -172,20 +1970,56 @@ class LoginSystem:
         default_font = ("Segoe UI", 10)
         master.option_add("*Font", default_font)
 
+        # Screens and dialogs are built once and then shown/hidden
+        self.screens = {}
+        self.current_screen = None
+        self.dialogs = {}
+        self.dialog_open_times = {}
+
+        # Long jobs (export, duplicate check) run off the Tk thread; titles of running jobs
+        self.background_jobs = set()
+
+        # Close the roster cleanly when the window is closed
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self.create_login_screen()
     
-    def load_users(self):
-        """Load existing user credentials from text file"""
-        users = {}
-        try:
-            if os.path.exists(self.users_file):
-                with open(self.users_file, 'r') as file:
-                    for line in file:
-                        username, password = line.strip().split(':', 1)
-                        users[username] = password
-        except Exception as e:
-            print(f"Error loading users: {e}")
-        return users
+    def load_state(self):
+        """
+        Load users, students and everything kept current from the change feed
+        - Returns True when the startup snapshot was used
+        """
+        state, from_snapshot = load_roster_state(self.users_file, self.students_file,
+                                                 self.change_feed, self.snapshot_file)
+        self.users = state['users']
+        self.students = state['students']
+        self.student_counts = state['student_counts']
+        self.duplicate_index = state['duplicate_index']
+        self.query_indexes = state['query_indexes']
+        self.query_planner = state['query_planner']
+
+        # What the snapshot was made from, so closing can skip saving an unchanged one
+        self.loaded_sequence = self.change_feed.last_sequence
+        self.loaded_file_stats = self._data_file_stats()
+        return from_snapshot
+
+    def _data_file_stats(self):
+        """(size, mtime_ns) of the users and students files (None for a missing file)"""
+        stats = []
+        for path in (self.users_file, self.students_file):
+            stat = os.stat(path) if os.path.exists(path) else None
+            stats.append(stat and (stat.st_size, stat.st_mtime_ns))
+        return stats
+
+    def save_state(self):
+        """Save the loaded state as the startup snapshot"""
+        save_roster_snapshot(self.snapshot_file, self.users_file, self.students_file, {
+            'users': self.users,
+            'students': self.students,
+            'student_counts': self.student_counts,
+            'duplicate_index': self.duplicate_index,
+            'query_indexes': self.query_indexes
+        })
     
     def save_users(self):
         """Save user credentials to text file"""
@@ -196,40 +2030,6 @@ class LoginSystem:
         except Exception as e:
             messagebox.showerror("Save Error", f"Could not save users: {e}")
     
-    def load_students(self):
-        """Load existing student data from text file"""
-        students = {}
-        try:
-            if os.path.exists(self.students_file):
-                with open(self.students_file, 'r') as file:
-                    for line in file:
-                        # Parsing student data from text line
-                        parts = line.strip().split('|')
-                        if len(parts) >= 6:
-                            student_id, name, age, classification, major, grade = parts
-                            students[student_id] = {
-                                'id': student_id,
-                                'name': name,
-                                'age': age,
-                                'classification': classification,
-                                'major': major,
-                                'grade': grade
-                            }
-        except Exception as e:
-            print(f"Error loading students: {e}")
-        return students
-    
-    def save_students(self):
-        """Save student data to text file"""
-        try:
-            with open(self.students_file, 'w') as file:
-                for student_id, student_data in self.students.items():
-                    # Create a text line with all student details
-                    line = f"{student_data['id']}|{student_data['name']}|{student_data['age']}|{student_data['classification']}|{student_data['major']}|{student_data.get('grade', 'N/A')}\n"
-                    file.write(line)
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Could not save students: {e}")
-
     # The rest of the methods remain the same as in the previous implementation
     # (login, create_login_screen, create_dashboard_screen, add_student, 
     #  search_student_info, remove_student, display_student_count, 
@@ -238,15 +2038,93 @@ class LoginSystem:
     # Note: The code for these methods remains unchanged from the previous 
     # implementation, so I'm not repeating them here.
 
+    def _show_screen(self, key, build):
+        """Show a cached screen, building it on first use"""
+        screen = self.screens.get(key)
+        if screen is None:
+            screen = build()
+            self.screens[key] = screen
+
+        if self.current_screen is not None and self.current_screen is not screen:
+            self.current_screen.pack_forget()
+        screen.pack(fill=tk.BOTH, expand=True)
+        self.current_screen = screen
+        return screen
+
+    def _show_dialog(self, key, build, always_refresh=False):
+        """
+        Show a cached dialog window, building it on first use
+        - build() returns (window, refresh) and is only called once
+        - refresh() resets the dialog's fields/data when it is built or reopened after being
+          hidden; a dialog already on screen is only brought forward, keeping its input
+        - always_refresh also refreshes visible dialogs (for dialogs showing new data)
+        - Closing the window hides it instead of destroying it
+        """
+        start = time.perf_counter()
+
+        cached = self.dialogs.get(key)
+        if cached is None or not cached[0].winfo_exists():
+            window, refresh = build()
+            window.protocol("WM_DELETE_WINDOW", window.withdraw)
+            cached = (window, refresh)
+            self.dialogs[key] = cached
+            needs_refresh = True
+        else:
+            needs_refresh = always_refresh or cached[0].state() == 'withdrawn'
+            cached[0].deiconify()
+            cached[0].lift()
+
+        window, refresh = cached
+        if refresh and needs_refresh:
+            refresh()
+        window.update_idletasks()
+
+        # Record open latency (milliseconds) per dialog
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.dialog_open_times.setdefault(key, []).append(elapsed_ms)
+        return window
+
+    def log_dialog_open_times(self):
+        """Write the first (build) and later (cached) open latency of every dialog to the log"""
+        for key, times in sorted(self.dialog_open_times.items()):
+            reopens = sorted(times[1:])
+            reopen_text = (f"{len(reopens)} reopens, median {reopens[len(reopens) // 2]:.1f} ms"
+                           if reopens else "no reopens")
+            timing_logger.info(f"Dialog '{key}' opened: first {times[0]:.1f} ms, {reopen_text}")
+
+    def log_cache_stats(self):
+        """Write the out-of-core record cache hit/miss/eviction counters to the log"""
+        if not OUT_OF_CORE:
+            return
+        stats = self.students.cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / lookups if lookups else 0.0
+        timing_logger.info(f"Record cache: {stats['size']}/{stats['capacity']} records, "
+                           f"{stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1%} hit rate), "
+                           f"{stats['evictions']} evictions")
+
+    def _hide_dialogs(self):
+        """Hide every cached dialog window"""
+        for window, _ in self.dialogs.values():
+            if window.winfo_exists():
+                window.withdraw()
+
     def create_login_screen(self):
-        """Create the login screen with improved colors"""
-        # Clear any existing widgets
-        for widget in self.master.winfo_children():
-            widget.destroy()
+        """Show the login screen"""
+        self._hide_dialogs()
+        self._show_screen('login', self._build_login_screen)
         
+        # Start with empty credentials every time the screen is shown
+        self.username_entry.delete(0, tk.END)
+        self.password_entry.delete(0, tk.END)
+
+        # Bind Enter key to login
+        self.master.bind('<Return>', lambda event: self.login())
+
+    def _build_login_screen(self):
+        """Build the login screen with improved colors"""
         # Main frame with background color
         main_frame = tk.Frame(self.master, bg='#F0F4F8')
-        main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Title
         title_label = tk.Label(main_frame, text="Student Information System", 
@@ -319,8 +2197,7 @@ class LoginSystem:
                                   relief=tk.FLAT)
         signup_button.pack(side=tk.LEFT, padx=10)
         
-        # Bind Enter key to login
-        self.master.bind('<Return>', lambda event: self.login())
+        return main_frame
 
     
     def login(self):
@@ -338,7 +2215,7 @@ class LoginSystem:
             messagebox.showerror("Error", "Please enter a password")
             return
         
-        if username in self.users and self.users[username] == password:
+        if authenticate(self.users, username, password):
             # Successful login
             self.create_dashboard_screen(username)
             return
@@ -373,32 +2250,41 @@ class LoginSystem:
         )
     
     def create_dashboard_screen(self, username):
-        """Create the dashboard screen with colorful buttons"""
-        # Clear existing widgets
-        for widget in self.master.winfo_children():
-            widget.destroy()
+        """Show the dashboard screen for the logged in user"""
+        self._hide_dialogs()
+        self.master.unbind('<Return>')
         
         # Resize window for dashboard
-        self.master.geometry("400x450")
+        self.master.geometry("400x600")
         self.master.configure(bg='#F0F4F8')
         
-        # Title
-        title_label = tk.Label(self.master, text=f"Welcome, {username}\n\nMAIN MENU", 
+        self._show_screen('dashboard', self._build_dashboard_screen)
+        self.dashboard_title.config(text=f"Welcome, {username}\n\nMAIN MENU")
+
+    def _build_dashboard_screen(self):
+        """Build the dashboard screen with colorful buttons"""
+        dashboard_frame = tk.Frame(self.master, bg='#F0F4F8')
+
+        # Title (text is set every time the dashboard is shown)
+        self.dashboard_title = tk.Label(dashboard_frame,
                  font=("Segoe UI", 16, "bold"),
                  fg='#2C3E50',
                  bg='#F0F4F8')
-        title_label.pack(pady=(20,30))
+        self.dashboard_title.pack(pady=(20,30))
         
         # Button Frame
-        button_frame = tk.Frame(self.master, bg='#F0F4F8')
+        button_frame = tk.Frame(dashboard_frame, bg='#F0F4F8')
         button_frame.pack(pady=(0,20))
         
         # Button configurations
         button_configs = [
             ("Print Student Information", self.search_student_info, '#3498DB'),  # Blue
+            ("Advanced Search", self.advanced_search, '#2980B9'),  # Dark blue
             ("Add Student", self.add_student, '#2ECC71'),  # Green
             ("Remove Student", self.remove_student, '#E74C3C'),  # Red
             ("Display Number of Students", self.display_student_count, '#F39C12'),  # Orange
+            ("Export Reports", self.export_reports, '#9B59B6'),  # Purple
+            ("Find Duplicates", self.find_duplicate_students, '#1ABC9C'),  # Teal
             ("Logout", self.logout, '#95A5A6')  # Gray
         ]
         
@@ -414,6 +2300,8 @@ class LoginSystem:
                             relief=tk.FLAT)
             btn.pack(pady=(0,10))
 
+        return dashboard_frame
+
     def _darken_color(self, hex_color):
         """Helper method to darken a hex color"""
         # Convert hex to RGB
@@ -435,7 +2323,10 @@ class LoginSystem:
             messagebox.showinfo("Remove Student", "No students have been added yet.")
             return
 
-        # Create remove student window
+        self._show_dialog('remove_student', self._build_remove_student_window)
+
+    def _build_remove_student_window(self):
+        """Build the remove student window"""
         remove_window = tk.Toplevel(self.master)
         remove_window.title("Remove Student")
         remove_window.geometry("400x300")
@@ -460,21 +2351,29 @@ class LoginSystem:
                 confirm = messagebox.askyesno("Confirm Removal",
                                               f"Are you sure you want to remove {full_name} (ID: {student_id})?")
                 if confirm:
-                    # Remove student
-                    del self.students[student_id]
-                    # Save updated students
-                    self.save_students()
+                    # Remove student and save updated students
+                    try:
+                        self.students.remove(student_id)
+                    except Exception as e:
+                        messagebox.showerror("Save Error", f"Could not remove student: {e}")
+                        return
                     messagebox.showinfo("Success", f"Student {full_name} (ID: {student_id}) has been removed.")
-                    remove_window.destroy()
+                    remove_window.withdraw()
             else:
                 messagebox.showerror("Error", "No student found with the given name and ID.")
 
+        def reset():
+            full_name_entry.delete(0, tk.END)
+            student_id_entry.delete(0, tk.END)
+
         # Remove Button
         remove_button = tk.Button(remove_window, text="Remove",
                                   command=confirm_remove,
                                   font=("Helvetica", 12))
         remove_button.pack(pady=(0, 10))
 
+        return remove_window, reset
+
 
     def display_student_count(self):
         """Display the total number of students and students by major"""
@@ -483,25 +2382,10 @@ class LoginSystem:
             messagebox.showinfo("Student Count", "No students have been added yet.")
             return
         
+        self._show_dialog('student_count', self._build_student_count_window, always_refresh=True)
         
-        # Count students by major
-        major_counts = {
-            "Computer Science": 0,
-            "Business": 0,
-            "Arts": 0,
-            "Engineering": 0
-        }
-        
-        # Count students in each major
-        for student in self.students.values():
-            major = student.get('major', 'Unknown')
-            if major in major_counts:
-                major_counts[major] += 1
-
-        # Use len(self.students) instead of any class variables
-        total_students = sum(major_counts.values())
-        
-        # Create student count window
+    def _build_student_count_window(self):
+        """Build the student count window"""
         count_window = tk.Toplevel(self.master)
         count_window.title("Student Count")
         count_window.geometry("300x300")
@@ -511,13 +2395,164 @@ class LoginSystem:
         count_frame.pack(padx=20, pady=20)
         
         # Total Students Label
-        tk.Label(count_frame, text=f"Total Students: {total_students}", 
-                 font=("Helvetica", 14, "bold")).pack(anchor='w', pady=(0,10))
+        total_label = tk.Label(count_frame, font=("Helvetica", 14, "bold"))
+        total_label.pack(anchor='w', pady=(0,10))
         
         # Major-specific counts
-        for major, count in major_counts.items():
-            tk.Label(count_frame, text=f"{major} Students: {count}", 
-                     font=("Helvetica", 12)).pack(anchor='w', pady=(0,5))
+        major_labels = {}
+        for major in MAJORS:
+            major_labels[major] = tk.Label(count_frame, font=("Helvetica", 12))
+            major_labels[major].pack(anchor='w', pady=(0,5))
+
+        def refresh():
+            # Counts are maintained incrementally from the change feed
+            major_counts = self.student_counts.by_major
+            total_students = sum(major_counts.values())
+
+            # Only the label text changes between openings
+            total_label.config(text=f"Total Students: {total_students}")
+            for major, count in major_counts.items():
+                major_labels[major].config(text=f"{major} Students: {count}")
+
+        return count_window, refresh
+
+    def on_close(self):
+        """Close the roster and exit the application"""
+        try:
+            self.students.close()
+        except Exception as e:
+            log_error("Could not close the student roster", e)
+
+        # Next startup can skip parsing the data files; an unchanged roster keeps its snapshot
+        if (self.change_feed.last_sequence != self.loaded_sequence
+                or self._data_file_stats() != self.loaded_file_stats):
+            self.save_state()
+        self.log_dialog_open_times()
+        self.log_cache_stats()
+        self.master.destroy()
+
+    def _run_in_background(self, title, work, on_done, error_title, failure):
+        """
+        Run a long job on a worker thread and pass its result to on_done on the Tk thread
+        - Tk is only touched from its own thread, which polls for the result with master.after
+        - The window title lists running jobs, and a job is not started twice
+        """
+        if title in self.background_jobs:
+            messagebox.showinfo(title, f"{title} is already running.")
+            return
+
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = work()
+            except Exception as e:
+                outcome['error'] = e
+
+        def poll():
+            if thread.is_alive():
+                self.master.after(BACKGROUND_POLL_MS, poll)
+                return
+
+            self.background_jobs.discard(title)
+            self._update_title()
+            if 'error' in outcome:
+                log_error(f"{title} failed", outcome['error'])
+                messagebox.showerror(error_title, f"{failure}: {outcome['error']}")
+            else:
+                on_done(outcome['result'])
+
+        self.background_jobs.add(title)
+        self._update_title()
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.master.after(BACKGROUND_POLL_MS, poll)
+
+    def _update_title(self):
+        title = "Student Information System"
+        if self.background_jobs:
+            title += " - " + ", ".join(f"{job}..." for job in sorted(self.background_jobs))
+        self.master.title(title)
+
+    def _copy_students_file(self, work_dir):
+        """
+        Copy the students file, holding the roster lock so no change is half written
+        - Out-of-core files are compacted first if they hold superseded lines
+        Returns the path of the copy
+        """
+        os.makedirs(work_dir, exist_ok=True)
+        handle, copy_path = tempfile.mkstemp(prefix='students_', suffix='.txt', dir=work_dir)
+        os.close(handle)
+        with self.students.lock:
+            # The in-memory roster rewrites the file on every change, so it is always current
+            if getattr(self.students, 'dirty', False):
+                self.students.compact()
+            shutil.copyfile(self.students_file, copy_path)
+        return copy_path
+
+    def export_reports(self):
+        """Export per-major CSV and HTML rosters sorted by name"""
+        # If no students exist
+        if not self.students:
+            messagebox.showinfo("Export Reports", "No students have been added yet.")
+            return
+
+        def work():
+            # Reports are built from a copy, so adds and removes can go on meanwhile
+            students_copy = self._copy_students_file(REPORTS_DIR)
+            try:
+                return export_reports(students_copy)
+            finally:
+                os.remove(students_copy)
+
+        def on_done(result):
+            timings = result['timings']
+            lines = [f"{major}: {count} students" for major, count in result['majors'].items()]
+            lines.append("")
+            lines.append(f"Partition: {timings['partition']:.2f}s")
+            lines.append(f"Sort and render: {timings['render']:.2f}s")
+            lines.append(f"Total: {timings['total']:.2f}s")
+            messagebox.showinfo("Export Reports",
+                                f"Reports saved to '{REPORTS_DIR}'\n\n" + "\n".join(lines))
+
+        self._run_in_background("Export Reports", work, on_done,
+                                "Export Error", "Could not export reports")
+
+    def find_duplicate_students(self):
+        """Write a ranked report of students that are likely entered more than once"""
+        # If no students exist
+        if not self.students:
+            messagebox.showinfo("Find Duplicates", "No students have been added yet.")
+            return
+
+        def work():
+            students_copy = self._copy_students_file(REPORTS_DIR)
+            try:
+                result = find_duplicates(iter_student_records(students_copy), work_dir=REPORTS_DIR)
+            finally:
+                os.remove(students_copy)
+            report_path = write_duplicates_report(result['candidates'], self.students)
+
+            # Show the best few candidates; the report has all of them
+            lines = []
+            for score, id_a, id_b in result['candidates'][:10]:
+                name_a = (self.students.get(id_a) or {}).get('name', 'N/A')
+                name_b = (self.students.get(id_b) or {}).get('name', 'N/A')
+                lines.append(f"{score:.2f}: {name_a} ({id_a}) / {name_b} ({id_b})")
+            return len(result['candidates']), report_path, lines
+
+        def on_done(result):
+            count, report_path, lines = result
+            if not count:
+                messagebox.showinfo("Find Duplicates", "No likely duplicate students found.")
+                return
+            messagebox.showinfo("Find Duplicates",
+                                f"{count} possible duplicates saved to '{report_path}'\n\n"
+                                + "\n".join(lines))
+
+        self._run_in_background("Find Duplicates", work, on_done,
+                                "Duplicate Error", "Could not check for duplicates")
+
     def logout(self):
         """Logout and return to login screen"""
         # Confirm logout
@@ -527,7 +2562,7 @@ class LoginSystem:
             # Reset login attempts
             self.login_attempts = 0
                     
-            # Recreate login screen
+            # Show login screen again
             self.create_login_screen()
             
     
@@ -538,7 +2573,10 @@ class LoginSystem:
             messagebox.showinfo("Student Information", "No students have been added yet.")
             return
         
-        # Create search window
+        self._show_dialog('search_student', self._build_search_window)
+
+    def _build_search_window(self):
+        """Build the search student window"""
         search_window = tk.Toplevel(self.master)
         search_window.title("Search Student")
         search_window.geometry("400x200")
@@ -559,21 +2597,7 @@ class LoginSystem:
             last_name = last_name_entry.get().strip().lower()
             
             # Find matching students
-            matches = []
-            for student_id, student_data in self.students.items():
-                full_name = student_data.get('name', '').lower()
-                
-                # Check if both first and last names match
-                if first_name and last_name:
-                    if first_name in full_name and last_name in full_name:
-                        matches.append((student_id, student_data))
-                # Check if either first or last name matches
-                elif first_name:
-                    if first_name in full_name:
-                        matches.append((student_id, student_data))
-                elif last_name:
-                    if last_name in full_name:
-                        matches.append((student_id, student_data))
+            matches = search_students_by_name(self.students, first_name, last_name)
             
             # If no matches found
             if not matches:
@@ -583,64 +2607,243 @@ class LoginSystem:
             # If only one match, show details directly
             if len(matches) == 1:
                 student_id, student_data = matches[0]
-                show_student_details(student_id, student_data)
+                self.show_student_details(student_id, student_data)
                 return
             
-            # Multiple matches - create selection dialog
-            select_student_window = tk.Toplevel(search_window)
-            select_student_window.title("Select Student")
-            select_student_window.geometry("400x300")
+            # Multiple matches - show selection dialog
+            self.select_student(matches)
             
-            # Label
-            tk.Label(select_student_window, 
-                     text="Multiple Students Found. Please Select:", 
-                     font=("Helvetica", 12, "bold")).pack(pady=(10,10))
+        def reset():
+            first_name_entry.delete(0, tk.END)
+            last_name_entry.delete(0, tk.END)
+            
+        # Search Button
+        search_button = tk.Button(search_window, text="Search",
+                                  command=search_students,
+                                  font=("Helvetica", 12))
+        search_button.pack(pady=(0,10))
             
-            # Listbox to display matching students
-            student_listbox = tk.Listbox(select_student_window, 
-                                         font=("Helvetica", 12), 
-                                         width=50)
-            student_listbox.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        return search_window, reset
+
+    def advanced_search(self):
+        """Search students by any combination of major, classification, age, ID prefix and name"""
+        # If no students exist
+        if not self.students:
+            messagebox.showinfo("Advanced Search", "No students have been added yet.")
+            return
+
+        self._show_dialog('advanced_search', self._build_advanced_search_window)
+
+    def _build_advanced_search_window(self):
+        """Build the advanced search window"""
+        search_window = tk.Toplevel(self.master)
+        search_window.title("Advanced Search")
+        search_window.geometry("520x650")
+
+        # Filter inputs
+        filter_frame = tk.Frame(search_window)
+        filter_frame.pack(padx=10, pady=(10,0), fill=tk.X)
+
+        tk.Label(filter_frame, text="Major:", font=("Helvetica", 12)).grid(row=0, column=0, sticky='w')
+        major_var = tk.StringVar()
+        ttk.Combobox(filter_frame, textvariable=major_var, values=["Any"] + MAJORS,
+                     width=25, state="readonly").grid(row=0, column=1, sticky='w', pady=2)
+
+        tk.Label(filter_frame, text="Classification:", font=("Helvetica", 12)).grid(row=1, column=0, sticky='w')
+        classification_var = tk.StringVar()
+        ttk.Combobox(filter_frame, textvariable=classification_var, values=["Any"] + CLASSIFICATIONS,
+                     width=25, state="readonly").grid(row=1, column=1, sticky='w', pady=2)
+
+        tk.Label(filter_frame, text="Age from:", font=("Helvetica", 12)).grid(row=2, column=0, sticky='w')
+        age_frame = tk.Frame(filter_frame)
+        age_frame.grid(row=2, column=1, sticky='w', pady=2)
+        min_age_entry = tk.Entry(age_frame, font=("Helvetica", 12), width=5)
+        min_age_entry.pack(side=tk.LEFT)
+        tk.Label(age_frame, text=" to ", font=("Helvetica", 12)).pack(side=tk.LEFT)
+        max_age_entry = tk.Entry(age_frame, font=("Helvetica", 12), width=5)
+        max_age_entry.pack(side=tk.LEFT)
+
+        tk.Label(filter_frame, text="ID starts with:", font=("Helvetica", 12)).grid(row=3, column=0, sticky='w')
+        id_prefix_entry = tk.Entry(filter_frame, font=("Helvetica", 12), width=27)
+        id_prefix_entry.grid(row=3, column=1, sticky='w', pady=2)
+
+        tk.Label(filter_frame, text="Name contains:", font=("Helvetica", 12)).grid(row=4, column=0, sticky='w')
+        name_entry = tk.Entry(filter_frame, font=("Helvetica", 12), width=27)
+        name_entry.grid(row=4, column=1, sticky='w', pady=2)
+
+        # Results
+        summary_label = tk.Label(search_window, font=("Helvetica", 12, "bold"))
+        student_listbox = tk.Listbox(search_window, font=("Helvetica", 12), width=50, height=10)
+
+        # Query plan and timings
+        explain_text = tk.Text(search_window, font=("Courier", 9), height=7, width=60,
+                               state=tk.DISABLED, bg='#F0F4F8', relief=tk.FLAT)
+
+        results = []
+
+        def build_query():
+            """Turn the filled in fields into a StudentQuery (None if invalid)"""
+            query = StudentQuery()
+            if major_var.get() not in ("", "Any"):
+                query = query.major(major_var.get())
+            if classification_var.get() not in ("", "Any"):
+                query = query.classification(classification_var.get())
+
+            try:
+                min_age = int(min_age_entry.get()) if min_age_entry.get().strip() else None
+                max_age = int(max_age_entry.get()) if max_age_entry.get().strip() else None
+            except ValueError:
+                messagebox.showerror("Error", "Ages must be whole numbers")
+                return None
+            if min_age is not None or max_age is not None:
+                query = query.age_between(min_age, max_age)
+
+            if id_prefix_entry.get().strip():
+                query = query.id_prefix(id_prefix_entry.get().strip())
+            if name_entry.get().strip():
+                query = query.name_contains(name_entry.get().strip())
+            return query
+
+        def run_search():
+            query = build_query()
+            if query is None:
+                return
+
+            result = self.query_planner.run(query, limit=ADVANCED_SEARCH_LIMIT)
+            results[:] = result['students']
+
+            student_listbox.delete(0, tk.END)
+            for student_data in results:
+                student_listbox.insert(tk.END,
+                    f"ID: {student_data['id']} - Name: {student_data.get('name', 'N/A')}")
+
+            summary = f"{result['total']} students found"
+            if result['total'] > ADVANCED_SEARCH_LIMIT:
+                summary += f" (showing first {ADVANCED_SEARCH_LIMIT})"
+            summary_label.config(text=summary)
+
+            timings = result['timings']
+            explain_text.config(state=tk.NORMAL)
+            explain_text.delete('1.0', tk.END)
+            explain_text.insert(tk.END, result['explain'] +
+                                f"\nPlan: {timings['plan']:.2f} ms, Execute: {timings['execute']:.2f} ms")
+            explain_text.config(state=tk.DISABLED)
+
+        def on_select():
+            """Show details of the selected result"""
+            selected_indices = student_listbox.curselection()
+            if not selected_indices:
+                messagebox.showwarning("Selection", "Please select a student.")
+                return
+            student_data = results[selected_indices[0]]
+            self.show_student_details(student_data['id'], student_data)
+
+        def reset():
+            major_var.set("Any")
+            classification_var.set("Any")
+            for entry in (min_age_entry, max_age_entry, id_prefix_entry, name_entry):
+                entry.delete(0, tk.END)
+            results.clear()
+            student_listbox.delete(0, tk.END)
+            summary_label.config(text="")
+            explain_text.config(state=tk.NORMAL)
+            explain_text.delete('1.0', tk.END)
+            explain_text.config(state=tk.DISABLED)
+
+        # Search Button
+        tk.Button(search_window, text="Search", command=run_search,
+                  font=("Helvetica", 12)).pack(pady=(10,5))
+
+        summary_label.pack()
+        student_listbox.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
+
+        # View Details Button
+        tk.Button(search_window, text="View Details", command=on_select,
+                  font=("Helvetica", 12)).pack(pady=(0,5))
+        explain_text.pack(padx=10, pady=(0,10))
             
-            # Populate listbox
-            for student_id, student_data in matches:
+        return search_window, reset
+
+    def select_student(self, matches):
+        """Let the user pick one student out of several matches"""
+        self.selection_matches = matches
+        self._show_dialog('select_student', self._build_select_student_window, always_refresh=True)
+
+    def _build_select_student_window(self):
+        """Build the student selection window"""
+        select_student_window = tk.Toplevel(self.master)
+        select_student_window.title("Select Student")
+        select_student_window.geometry("400x300")
+
+        # Label
+        tk.Label(select_student_window,
+                 text="Multiple Students Found. Please Select:",
+                 font=("Helvetica", 12, "bold")).pack(pady=(10,10))
+
+        # Listbox to display matching students
+        student_listbox = tk.Listbox(select_student_window,
+                                     font=("Helvetica", 12),
+                                     width=50)
+        student_listbox.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+
+        def refresh():
+            # Repopulate listbox with the current matches
+            student_listbox.delete(0, tk.END)
+            for student_id, student_data in self.selection_matches:
                 student_listbox.insert(tk.END, 
                     f"ID: {student_id} - Name: {student_data.get('name', 'N/A')}")
             
-            def on_select():
-                """Handle student selection"""
-                # Get selected index
-                selected_indices = student_listbox.curselection()
+        def on_select():
+            """Handle student selection"""
+            # Get selected index
+            selected_indices = student_listbox.curselection()
                 
-                # Check if a student is selected
-                if not selected_indices:
-                    messagebox.showwarning("Selection", "Please select a student.")
-                    return
+            # Check if a student is selected
+            if not selected_indices:
+                messagebox.showwarning("Selection", "Please select a student.")
+                return
                 
-                # Get selected student
-                selected_index = selected_indices[0]
-                selected_student_id, selected_student_data = matches[selected_index]
+            # Get selected student
+            selected_index = selected_indices[0]
+            selected_student_id, selected_student_data = self.selection_matches[selected_index]
                 
-                # Close selection window and show details
-                select_student_window.destroy()
-                show_student_details(selected_student_id, selected_student_data)
+            # Hide selection window and show details
+            select_student_window.withdraw()
+            self.show_student_details(selected_student_id, selected_student_data)
             
-            # Select Button
-            select_button = tk.Button(select_student_window, 
-                                      text="View Details", 
-                                      command=on_select, 
-                                      font=("Helvetica", 12))
-            select_button.pack(pady=(10,10))
-        
-        def show_student_details(student_id, student_data):
-            """Display detailed information for a student"""
-            details_window = tk.Toplevel(self.master)
+        # Select Button
+        select_button = tk.Button(select_student_window,
+                                  text="View Details",
+                                  command=on_select,
+                                  font=("Helvetica", 12))
+        select_button.pack(pady=(10,10))
+        
+        return select_student_window, refresh
+
+    def show_student_details(self, student_id, student_data):
+        """Display detailed information for a student"""
+        self.details_student = (student_id, student_data)
+        self._show_dialog('student_details', self._build_student_details_window, always_refresh=True)
+
+    def _build_student_details_window(self):
+        """Build the student details window"""
+        details_window = tk.Toplevel(self.master)
+        details_window.geometry("300x350")
+
+        # Details frame
+        details_frame = tk.Frame(details_window)
+        details_frame.pack(padx=20, pady=20)
+
+        value_labels = {}
+        for label in ("Student ID", "Name", "Age", "Classification"):
+            tk.Label(details_frame, text=f"{label}:",
+                     font=("Helvetica", 12, "bold")).pack(anchor='w')
+            value_labels[label] = tk.Label(details_frame, font=("Helvetica", 12))
+            value_labels[label].pack(anchor='w', pady=(0,10))
+
+        def refresh():
+            student_id, student_data = self.details_student
             details_window.title(f"Student Details - {student_id}")
-            details_window.geometry("300x350")
-            
-            # Details frame
-            details_frame = tk.Frame(details_window)
-            details_frame.pack(padx=20, pady=20)
             
             details = [
                 ("Student ID", student_id),
@@ -650,20 +2853,16 @@ class LoginSystem:
             ]
             
             for label, value in details:
-                tk.Label(details_frame, text=f"{label}:", 
-                         font=("Helvetica", 12, "bold")).pack(anchor='w')
-                tk.Label(details_frame, text=value, 
-                         font=("Helvetica", 12)).pack(anchor='w', pady=(0,10))
+                value_labels[label].config(text=value)
         
-        # Search Button
-        search_button = tk.Button(search_window, text="Search", 
-                                  command=search_students, 
-                                  font=("Helvetica", 12))
-        search_button.pack(pady=(0,10))
+        return details_window, refresh
 
     def add_student(self):
         """Open dialog to add a new student"""
-        # Create add student window
+        self._show_dialog('add_student', self._build_add_student_window)
+
+    def _build_add_student_window(self):
+        """Build the add student window"""
         add_student_window = tk.Toplevel(self.master)
         add_student_window.title("Add Student")
         add_student_window.geometry("400x550")  # Slightly increased height
@@ -693,7 +2892,7 @@ class LoginSystem:
         tk.Label(add_student_window, text="Select Classification:", font=("Helvetica", 12)).pack()
         classification_var = tk.StringVar()
         classification_dropdown = ttk.Combobox(add_student_window, textvariable=classification_var, 
-                                      values=["Freshman", "Sophomore", "Junior", "Senior"], 
+                                      values=CLASSIFICATIONS, 
                                       width=27, state="readonly")
         classification_dropdown.pack(pady=(0,10))
 
@@ -701,10 +2900,19 @@ class LoginSystem:
         tk.Label(add_student_window, text="Select Major:", font=("Helvetica", 12)).pack()
         major_var = tk.StringVar()
         major_dropdown = ttk.Combobox(add_student_window, textvariable=major_var, 
-                                      values=["Computer Science", "Business", "Arts", "Engineering"], 
+                                      values=MAJORS, 
                                       width=27, state="readonly")
         major_dropdown.pack(pady=(0, 20))
 
+        def reset():
+            # Reset entry fields
+            student_id_entry.delete(0, tk.END)
+            first_name_entry.delete(0, tk.END)
+            last_name_entry.delete(0, tk.END)
+            age_entry.delete(0, tk.END)
+            classification_dropdown.set('')
+            major_dropdown.set('')
+
         def save_student():
             """Save the new student to the system"""
             student_id = student_id_entry.get().strip()
@@ -715,8 +2923,9 @@ class LoginSystem:
             major = major_var.get()
 
             # Enhanced Validation
-            if not student_id:
-                messagebox.showerror("Error", "Student ID is required")
+            valid, message = validate_student_id(student_id)
+            if not valid:
+                messagebox.showerror("Error", message)
                 return
             
             if not first_name or not last_name:
@@ -725,10 +2934,10 @@ class LoginSystem:
 
             try:
                 age = int(age)
-                if age < 5 or age > 100:
+                if age < MIN_AGE or age > MAX_AGE:
                     raise ValueError("Invalid age")
             except ValueError:
-                messagebox.showerror("Error", "Age must be a valid number between 5 and 100")
+                messagebox.showerror("Error", f"Age must be a valid number between {MIN_AGE} and {MAX_AGE}")
                 return
 
             if not classification:
@@ -754,10 +2963,20 @@ class LoginSystem:
                 'major': major
             }
 
-            # Save student to dictionary
+            # Warn if the same person already seems to be registered under another ID
+            if self.duplicate_index is not None:
+                matches = self.duplicate_index.find_matches(student_data, self.students)
+                if matches:
+                    other = matches[0][1]
+                    if not messagebox.askyesno(
+                            "Possible Duplicate",
+                            f"{full_name} looks like {other['name']} (ID: {other['id']}, Age: {other['age']}).\n\n"
+                            "Add this student anyway?"):
+                        return
+
+            # Save student to the roster
             try:
-                self.students[student_id] = student_data
-                self.save_students()
+                self.students.add(student_data)
 
                 # Dynamically create student objects based on major
                 if major == "Computer Science":
@@ -769,13 +2988,7 @@ class LoginSystem:
                 elif major == "Engineering":
                     student = EngineeringStudent(student_id, full_name, age, classification)
 
-                # Reset entry fields
-                student_id_entry.delete(0, tk.END)
-                first_name_entry.delete(0, tk.END)
-                last_name_entry.delete(0, tk.END)
-                age_entry.delete(0, tk.END)
-                classification_dropdown.set('')
-                major_dropdown.set('')
+                reset()
 
                 messagebox.showinfo("Success", f"Student {full_name} added successfully!")
 
@@ -789,9 +3002,14 @@ class LoginSystem:
                                 width=25)
         save_button.pack(pady=(0, 20))
     
+        return add_student_window, reset
+
     def create_new_user(self):
-        """Create a new user with validation"""
-        # Open signup dialog
+        """Open dialog to create a new user"""
+        self._show_dialog('signup', self._build_signup_window)
+
+    def _build_signup_window(self):
+        """Build the sign up window with validation"""
         signup_window = tk.Toplevel(self.master)
         signup_window.title("Sign Up")
         signup_window.geometry("400x300")
@@ -811,6 +3029,11 @@ class LoginSystem:
         tk.Label(signup_window, text="Confirm Password:", font=("Helvetica", 12), bg='#F0F4F8').pack()
         confirm_password_entry = tk.Entry(signup_window, show="*", font=("Helvetica", 12), width=30)
         confirm_password_entry.pack(pady=(0,20))
+
+        def reset():
+            username_entry.delete(0, tk.END)
+            password_entry.delete(0, tk.END)
+            confirm_password_entry.delete(0, tk.END)
         
         def submit_signup():
             """Handle user signup submission"""
@@ -840,7 +3063,7 @@ class LoginSystem:
             self.save_users()
             
             messagebox.showinfo("Success", "User created successfully!")
-            signup_window.destroy()
+            signup_window.withdraw()
             
             # Reset login attempts
             self.login_attempts = 0
@@ -856,12 +3079,300 @@ class LoginSystem:
                                  relief=tk.FLAT)
         submit_button.pack(pady=(20,0))
 
+        return signup_window, reset
+
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def parse_operation_mix(text):
+    """Parse an operation mix such as 'add=20,search=40' into {operation: weight}"""
+    mix = {}
+    for part in text.split(','):
+        operation, _, weight = part.partition('=')
+        operation = operation.strip()
+        if operation not in LOAD_TEST_MIX:
+            raise ValueError(f"Unknown operation '{operation}' (expected one of {', '.join(LOAD_TEST_MIX)})")
+        mix[operation] = float(weight)
+    return mix
+
+class LoadTestSession:
+    """One simulated registrar working the roster from its own thread"""
+
+    FIRST_NAMES = ["Ann", "Bob", "Carla", "Dev", "Elena", "Farid", "Grace", "Hugo", "Ines", "Jamal"]
+    LAST_NAMES = ["Adams", "Baker", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hill", "Ito", "Jones"]
+
+    def __init__(self, number, harness, seed):
+        self.number = number
+        self.harness = harness
+        self.random = random.Random(seed)
+        self.username = f"loadtest{number}"
+        self.added_ids = []
+        self.next_id = 0
+        self.latencies = {operation: [] for operation in LOAD_TEST_MIX}
+        self.errors = {operation: 0 for operation in LOAD_TEST_MIX}
+        self.adds = 0
+        self.removes = 0
+        self.duplicate_warnings = 0
+
+    def login(self):
+        # Every tenth login uses a wrong password, like a registrar mistyping it
+        password = LOAD_TEST_PASSWORD if self.random.random() >= 0.1 else "wrong"
+        if authenticate(self.harness.users, self.username, password) != (password == LOAD_TEST_PASSWORD):
+            raise AssertionError(f"Unexpected login result for {self.username}")
+
+    def add(self):
+        self.next_id += 1
+        student_data = {
+            'id': f"L{self.number:03d}{self.next_id:06d}",
+            'name': f"{self.random.choice(self.FIRST_NAMES)} {self.random.choice(self.LAST_NAMES)}",
+            'age': self.random.randint(17, 30),
+            'classification': self.random.choice(CLASSIFICATIONS),
+            'major': self.random.choice(MAJORS)
+        }
+        # Same inline check as the add student dialog; the registrar always confirms the add
+        duplicate_index = self.harness.duplicate_index
+        if duplicate_index is not None and duplicate_index.find_matches(student_data, self.harness.students):
+            self.duplicate_warnings += 1
+        self.harness.students.add(student_data)
+        self.added_ids.append(student_data['id'])
+        self.adds += 1
+
+    def search(self):
+        first_name = self.random.choice(self.FIRST_NAMES).lower()
+        last_name = self.random.choice(self.LAST_NAMES).lower()
+        return search_students_by_name(self.harness.students, first_name, last_name)
+
+    def query(self):
+        query = StudentQuery().major(self.random.choice(MAJORS)).id_prefix(f"L{self.number:03d}")
+        return self.harness.query_planner.run(query, limit=ADVANCED_SEARCH_LIMIT)
+
+    def remove(self):
+        # Sessions only remove students they added, so removals never race each other
+        if not self.added_ids:
+            return
+        student_id = self.added_ids.pop(self.random.randrange(len(self.added_ids)))
+        self.harness.students.remove(student_id)
+        self.removes += 1
+
+    def count(self):
+        return sum(self.harness.student_counts.by_major.values())
+
+    def run(self, operations, mix):
+        """Log in, then run the given number of operations picked by weight from the mix"""
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        self._timed('login')
+        for _ in range(operations):
+            self._timed(self.random.choices(names, weights)[0])
+
+    def _timed(self, operation):
+        start = time.perf_counter()
+        try:
+            getattr(self, operation)()
+        except Exception as e:
+            self.errors[operation] += 1
+            log_error(f"Load test {operation} failed in session {self.number}", e)
+        self.latencies[operation].append((time.perf_counter() - start) * 1000)
+
+class LoadTestHarness:
+    """
+    Drives the headless roster core (no Tk) from many simulated sessions at once
+    - Each session runs in its own thread against one shared roster, change feed and indexes
+    - Works in a temporary data directory, so real data is never touched
+    """
+
+    def __init__(self, sessions=8, operations=200, mix=None, initial_students=1000, seed=None):
+        self.sessions = sessions
+        self.operations = operations
+        self.mix = dict(mix or LOAD_TEST_MIX)
+        self.initial_students = initial_students
+        self.seed = seed
+
+    def _setup(self, data_dir):
+        """Create users and seed students, then load them with the app's own loader"""
+        self.users_file = os.path.join(data_dir, 'users.txt')
+        self.students_file = os.path.join(data_dir, 'students.txt')
+
+        with open(self.users_file, 'w') as file:
+            for number in range(self.sessions):
+                file.write(f"loadtest{number}:{LOAD_TEST_PASSWORD}\n")
+
+        seed_random = random.Random(self.seed)
+        with open(self.students_file, 'w') as file:
+            for number in range(self.initial_students):
+                file.write(format_student_line({
+                    'id': f"S{number:07d}",
+                    'name': f"{seed_random.choice(LoadTestSession.FIRST_NAMES)} {seed_random.choice(LoadTestSession.LAST_NAMES)}",
+                    'age': seed_random.randint(17, 30),
+                    'classification': seed_random.choice(CLASSIFICATIONS),
+                    'major': seed_random.choice(MAJORS)
+                }))
+
+        self.change_feed = ChangeFeed(os.path.join(data_dir, 'changes.log'))
+        state, _ = load_roster_state(self.users_file, self.students_file, self.change_feed)
+        self.users = state['users']
+        self.students = state['students']
+        self.student_counts = state['student_counts']
+        self.duplicate_index = state['duplicate_index']
+        self.query_indexes = state['query_indexes']
+        self.query_planner = state['query_planner']
+
+    def run(self):
+        """Run every session to completion and return the report dictionary"""
+        data_dir = tempfile.mkdtemp(prefix='sis_load_test_')
+        try:
+            self._setup(data_dir)
+            start_sequence = self.change_feed.last_sequence
 
+            sessions = [LoadTestSession(number, self,
+                                        None if self.seed is None else f"{self.seed}-{number}")
+                        for number in range(self.sessions)]
+            threads = [threading.Thread(target=session.run, args=(self.operations, self.mix))
+                       for session in sessions]
+
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            report = self._report(sessions, elapsed)
+            report['checks'] = self._consistency_checks(sessions, start_sequence)
+            return report
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    def _report(self, sessions, elapsed):
+        operations = {}
+        total = 0
+        total_errors = 0
+        for operation in LOAD_TEST_MIX:
+            latencies = sorted(latency for session in sessions for latency in session.latencies[operation])
+            errors = sum(session.errors[operation] for session in sessions)
+            if not latencies:
+                continue
+            total += len(latencies)
+            total_errors += errors
+            operations[operation] = {
+                'count': len(latencies),
+                'errors': errors,
+                'error_rate': errors / len(latencies),
+                'p50': _percentile(latencies, 50),
+                'p95': _percentile(latencies, 95),
+                'p99': _percentile(latencies, 99),
+                'max': latencies[-1]
+            }
+        return {
+            'sessions': self.sessions,
+            'elapsed': elapsed,
+            'operations_total': total,
+            'throughput': total / elapsed if elapsed else 0.0,
+            'errors': total_errors,
+            'error_rate': total_errors / total if total else 0.0,
+            'duplicate_warnings': sum(session.duplicate_warnings for session in sessions),
+            'operations': operations
+        }
+
+    def _consistency_checks(self, sessions, start_sequence):
+        """Return [(check, passed, detail), ...] comparing every derived structure with the roster"""
+        checks = []
+        adds = sum(session.adds for session in sessions)
+        removes = sum(session.removes for session in sessions)
+
+        expected = self.initial_students + adds - removes
+        checks.append(("Roster size matches successful adds/removes",
+                       len(self.students) == expected, f"{len(self.students)} (expected {expected})"))
+
+        recount = StudentCounts(self.students.values())
+        checks.append(("Counts match a full recount",
+                       recount.by_major == self.student_counts.by_major
+                       and recount.by_classification == self.student_counts.by_classification,
+                       f"{self.student_counts.by_major}"))
+
+        reloaded = StudentRoster(self.students_file)
+        reloaded.load()
+        # Records are compared as file lines, since added records have no grade until reloaded
+        checks.append(("Students file matches the in-memory roster",
+                       {student_id: format_student_line(student_data) for student_id, student_data in reloaded.items()}
+                       == {student_id: format_student_line(student_data)
+                           for student_id, student_data in self.students.items()},
+                       f"{len(reloaded)} students on disk"))
+
+        if self.duplicate_index is not None:
+            fresh = DuplicateIndex(self.students.values())
+            checks.append(("Duplicate index matches a rebuild", self.duplicate_index.blocks == fresh.blocks,
+                           f"{len(self.duplicate_index.blocks)} blocks"))
+
+        indexes_ok = True
+        for index, fresh in zip(self.query_indexes, build_query_indexes(self.students.values())):
+            if isinstance(index, FieldIndex):
+                indexes_ok &= ({value: ids for value, ids in index.ids.items() if ids}
+                               == {value: ids for value, ids in fresh.ids.items() if ids})
+            elif isinstance(index, AgeIndex):
+                indexes_ok &= (index.buckets == fresh.buckets and index.other == fresh.other
+                               and {key: ages for key, ages in index.outside_counts.items() if ages}
+                               == {key: ages for key, ages in fresh.outside_counts.items() if ages}
+                               and {key: counts for key, counts in index.counts.items() if any(counts)}
+                               == {key: counts for key, counts in fresh.counts.items() if any(counts)})
+            else:
+                indexes_ok &= index.ids == fresh.ids
+        checks.append(("Query indexes match a rebuild", indexes_ok, f"{len(self.query_indexes)} indexes"))
+
+        sequences = [event['seq'] for event in self.change_feed.read_from(start_sequence)]
+        contiguous = sequences == list(range(start_sequence + 1, start_sequence + len(sequences) + 1))
+        checks.append(("Change feed has one gapless event per change",
+                       contiguous and len(sequences) == adds + removes,
+                       f"{len(sequences)} events (expected {adds + removes})"))
+        return checks
+
+def format_load_test_report(report):
+    """Format a load test report as text"""
+    lines = [
+        f"Sessions: {report['sessions']}",
+        f"Operations: {report['operations_total']} in {report['elapsed']:.2f}s "
+        f"({report['throughput']:.1f} ops/s)",
+        f"Errors: {report['errors']} ({report['error_rate']:.2%})",
+        f"Duplicate warnings on add: {report['duplicate_warnings']}",
+        "",
+        f"{'Operation':<10}{'Count':>8}{'Errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>10}"
+    ]
+    for operation, stats in report['operations'].items():
+        lines.append(f"{operation:<10}{stats['count']:>8}{stats['errors']:>8}{stats['p50']:>10.2f}"
+                     f"{stats['p95']:>10.2f}{stats['p99']:>10.2f}{stats['max']:>10.2f}")
+    lines.append("")
+    for check, passed, detail in report['checks']:
+        lines.append(f"[{'PASS' if passed else 'FAIL'}] {check}: {detail}")
+    return "\n".join(lines)
 
 def main():
+    parser = argparse.ArgumentParser(description="Student Information System")
+    parser.add_argument('--load-test', action='store_true',
+                        help="run the multi-session load test instead of the GUI")
+    parser.add_argument('--sessions', type=int, default=8, help="simulated sessions (threads)")
+    parser.add_argument('--operations', type=int, default=200, help="operations per session")
+    parser.add_argument('--students', type=int, default=1000, help="students seeded before the run")
+    parser.add_argument('--mix', type=parse_operation_mix,
+                        help="operation weights, e.g. add=20,search=30,query=10,remove=10,count=20,login=10")
+    parser.add_argument('--seed', type=int, help="random seed for a repeatable run")
+    args = parser.parse_args()
+
+    if args.load_test:
+        harness = LoadTestHarness(sessions=args.sessions, operations=args.operations, mix=args.mix,
+                                  initial_students=args.students, seed=args.seed)
+        report = harness.run()
+        print(format_load_test_report(report))
+        return 0 if all(passed for _, passed, _ in report['checks']) else 1
+
     root = tk.Tk()
     LoginSystem(root)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())